@@ -0,0 +1,159 @@
+"""Compares the single and probing Logging search strategies on a stub connector.
+
+Each account gets a last activity age drawn from a mix of recently active,
+occasionally active and idle accounts. Queries are costed like Cloud Logging scans
+them: newest first, so a query reads from its window end down to the first match
+(per account lookups) or down to the oldest entry of the page (bulk lookups).
+
+    cd src && python -m benchmarks.log_search_strategy --accounts 500
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from plugin.conf.global_conf import LOG_BULK_PAGE_SIZE, LOG_FILTER_MAX_PRINCIPALS
+from plugin.connector.logging_connector import LoggingConnector, format_timestamp
+
+QUERY_COST = 0.2
+DAY_COST = 0.01
+ENTRIES_PER_DAY = 20
+
+
+class StubLoggingConnector(LoggingConnector):
+    def __init__(self, log_search_strategy: str, last_activity: dict, now: datetime):
+        # No client, credentials or cache; only what the lookups read
+        self.log_search_period = "1 Year"
+        self.activity_cache_ttl = 0
+        self.log_search_strategy = log_search_strategy
+        self.secret_digest = "benchmark"
+        self.last_activity = last_activity
+        self.now = now
+        self.queries = 0
+        self.cost = 0.0
+        self._entries = {}
+
+    def _charge(self, end_time: str, scanned_to: str) -> None:
+        self.queries += 1
+        days = (parse_timestamp(end_time) - parse_timestamp(scanned_to)).total_seconds()
+        self.cost += QUERY_COST + max(days, 0) / 86400 * DAY_COST
+
+    def _list_entries_service_accounts(
+        self, project_id, service_account_email, service_account_key_name, start, end
+    ) -> list:
+        last_activity = self.last_activity.get(service_account_email)
+        if last_activity is not None and start <= last_activity <= end:
+            self._charge(end, last_activity)
+            return [{"timestamp": last_activity}]
+        self._charge(end, start)
+        return []
+
+    def _list_entries_principals(
+        self, project_id, service_account_emails, start, end, page_token=None
+    ):
+        key = (service_account_emails, start, end)
+        if key not in self._entries:
+            self._entries[key] = self._make_entries(service_account_emails, start, end)
+        entries = self._entries[key]
+
+        offset = int(page_token or 0)
+        page = entries[offset : offset + LOG_BULK_PAGE_SIZE]
+        response = {"entries": page}
+        if offset + LOG_BULK_PAGE_SIZE < len(entries):
+            response["nextPageToken"] = str(offset + LOG_BULK_PAGE_SIZE)
+            self._charge(end, page[-1]["timestamp"])
+        else:
+            self._charge(end, start)
+        return response
+
+    def _make_entries(self, service_account_emails, start, end) -> list:
+        # Every active account logs ENTRIES_PER_DAY entries a day up to its last activity
+        entries = []
+        for email in service_account_emails:
+            last_activity = self.last_activity.get(email)
+            if last_activity is None or last_activity < start:
+                continue
+            newest = min(parse_timestamp(last_activity), parse_timestamp(end))
+            oldest = max(newest - timedelta(days=30), parse_timestamp(start))
+            step = timedelta(days=1) / ENTRIES_PER_DAY
+            timestamp = newest
+            while timestamp >= oldest:
+                entries.append(
+                    {
+                        "timestamp": format_timestamp(timestamp),
+                        "protoPayload": {
+                            "authenticationInfo": {"principalEmail": email}
+                        },
+                    }
+                )
+                timestamp -= step
+
+        entries.sort(key=lambda entry: entry["timestamp"], reverse=True)
+        return entries
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    return datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ")
+
+
+def make_last_activity(accounts: int, seed: int, now: datetime) -> dict:
+    # 60% active within a day, 25% within a quarter, 15% idle for the whole year
+    rng = random.Random(seed)
+    last_activity = {}
+    for index in range(accounts):
+        email = f"sa-{index}@benchmark.iam.gserviceaccount.com"
+        draw = rng.random()
+        if draw < 0.6:
+            age = timedelta(hours=rng.uniform(0, 24))
+        elif draw < 0.85:
+            age = timedelta(days=rng.uniform(1, 92))
+        else:
+            last_activity[email] = None
+            continue
+        last_activity[email] = format_timestamp(now - age)
+    return last_activity
+
+
+def run(strategy: str, mode: str, last_activity: dict, now: datetime) -> dict:
+    connector = StubLoggingConnector(strategy, last_activity, now)
+    emails = list(last_activity)
+    started_at = time.perf_counter()
+    if mode == "bulk":
+        for offset in range(0, len(emails), LOG_FILTER_MAX_PRINCIPALS):
+            connector.get_last_log_entry_timestamps(
+                "benchmark", emails[offset : offset + LOG_FILTER_MAX_PRINCIPALS]
+            )
+    else:
+        for email in emails:
+            connector.get_last_log_entry_timestamp("benchmark", email)
+    return {
+        "queries": connector.queries,
+        "cost": connector.cost,
+        "wall": time.perf_counter() - started_at,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    now = datetime.utcnow().replace(microsecond=0)
+    last_activity = make_last_activity(args.accounts, args.seed, now)
+
+    print(
+        f"{'mode':<12}{'strategy':<10}{'queries':>10}{'cost (s)':>12}{'wall (s)':>10}"
+    )
+    for mode in ["per_account", "bulk"]:
+        for strategy in ["single", "probing"]:
+            result = run(strategy, mode, last_activity, now)
+            print(
+                f"{mode:<12}{strategy:<10}{result['queries']:>10}"
+                f"{result['cost']:>12.1f}{result['wall']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
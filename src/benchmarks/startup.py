@@ -0,0 +1,107 @@
+"""Tracks the startup cost of the plugin: cold import and pre-warm.
+
+Every sample runs in a fresh interpreter so module and discovery caches start empty,
+and fails if importing the server or the connector base loads the Google client stack.
+The first collect setup is timed once without pre-warm and once right after it,
+which is the work pre-warm takes off the first Collector.collect.
+
+    cd src && python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SAMPLE = """
+import json, time
+from spaceone.core import config
+config.init_conf(package="plugin")
+
+started_at = time.perf_counter()
+import plugin.main
+import_time = time.perf_counter() - started_at
+
+# The Google client stack loads with the first connector, not with the server
+import sys
+import plugin.connector
+loaded = [name for name in {deferred_modules!r} if name in sys.modules]
+assert not loaded, f"Loaded at import: {{loaded}}"
+
+prewarm_time = None
+if {prewarm}:
+    started_at = time.perf_counter()
+    plugin.main._prewarm()
+    prewarm_time = time.perf_counter() - started_at
+
+# The loading the first collect does when nothing was pre-warmed
+started_at = time.perf_counter()
+plugin.main._prewarm()
+first_collect_time = time.perf_counter() - started_at
+
+print(json.dumps({{
+    "import": import_time,
+    "prewarm": prewarm_time,
+    "first_collect": first_collect_time,
+}}))
+"""
+
+
+DEFERRED_MODULES = [
+    "google.auth",
+    "google.oauth2",
+    "google_auth_httplib2",
+    "googleapiclient",
+    "httplib2",
+    "httpx",
+]
+
+
+def run_sample(prewarm: bool, cache_dir: str) -> dict:
+    env = {**os.environ, "PLUGIN_CACHE_DIR": cache_dir, "PLUGIN_PREWARM": ""}
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            SAMPLE.format(prewarm=prewarm, deferred_modules=DEFERRED_MODULES),
+        ],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cold = [run_sample(False, cache_dir) for _ in range(args.runs)]
+        warm = [run_sample(True, cache_dir) for _ in range(args.runs)]
+
+    rows = [
+        ("cold import", [sample["import"] for sample in cold]),
+        ("pre-warm", [sample["prewarm"] for sample in warm]),
+        ("first collect setup", [sample["first_collect"] for sample in cold]),
+        (
+            "first collect setup, pre-warmed",
+            [sample["first_collect"] for sample in warm],
+        ),
+    ]
+    print(f"{'step':<34}{'median (ms)':>12}{'max (ms)':>10}")
+    for name, times in rows:
+        print(
+            f"{name:<34}{statistics.median(times) * 1000:>12.1f}"
+            f"{max(times) * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,126 @@
+import os
+import tempfile
+
 # Icon URL Prefix for Cloud Service Type
 ICON_URL_PREFIX = "https://spaceone-custom-assets.s3.ap-northeast-2.amazonaws.com/console-assets/icons/cloud-services/google_cloud"
 
+# Local cache directory shared by all collects on this worker
+LOCAL_CACHE_DIR = os.environ.get(
+    "PLUGIN_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "plugin-google-cloud-iam-inven-collector"),
+)
+
+# Organization hierarchy index TTL in seconds. Off by default (0), since projects
+# created within the TTL are missing from collects that reuse the index
+HIERARCHY_CACHE_TTL = 0
+
+# Load the managers, discovery documents, static assets and the role catalog in the
+# background on the first Collector.init, before the first collect arrives
+PREWARM_ENABLED = os.environ.get("PLUGIN_PREWARM", "").lower() in ("1", "true", "yes")
+
+# Default number of worker threads for concurrent API calls
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Discovery documents named {service}.{version}.json in this directory are used instead
+# of the ones bundled with google-api-python-client. Unset, only the bundled ones are used
+DISCOVERY_DOCUMENT_DIR = os.environ.get("PLUGIN_DISCOVERY_DIR")
+
+# OAuth scopes of the access tokens shared by all connectors of a service account key
+GOOGLE_CLOUD_SCOPES = ("https://www.googleapis.com/auth/cloud-platform",)
+
+# Access tokens are refreshed this many seconds before they expire, and a refresh
+# requested within TOKEN_MIN_REFRESH_INTERVAL seconds of the previous one is skipped
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_MIN_REFRESH_INTERVAL = 10
+
+# Maximum number of idle discovery clients kept per (service, version, credential)
+CLIENT_POOL_MAX_IDLE = 32
+
+# Client pools and shared credentials are kept per secret. The least recently used
+# ones beyond these limits, and the ones unused for SECRET_CACHE_IDLE_TTL seconds,
+# are dropped so the keys of secrets no longer collected do not stay in memory
+CLIENT_POOL_MAX_POOLS = 256
+TOKEN_CACHE_MAX_CREDENTIALS = 64
+SECRET_CACHE_IDLE_TTL = 3600
+
+# Maximum number of sub-requests sent in one HTTP batch request
+BATCH_MAX_REQUESTS = 100
+
+# Retry policy of Google Cloud API calls (delays in seconds)
+RETRY_MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 1
+RETRY_MAX_DELAY = 32
+RETRYABLE_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+# Maximum number of retries across all API calls of one collect
+RETRY_BUDGET = 500
+
+# 403 error reasons that skip the remaining calls of an API for the project
+SERVICE_DISABLED_REASONS = ["SERVICE_DISABLED", "accessNotConfigured"]
+PERMISSION_DENIED_REASONS = ["PERMISSION_DENIED", "IAM_PERMISSION_DENIED"]
+
+# Default request rate limits (requests per minute) per API and quota project
+API_RATE_LIMITS = {
+    "cloudasset": 100,
+    "cloudidentity": 3000,
+    "cloudresourcemanager": 3000,
+    "iam": 6000,
+    "logging": 60,
+}
+
+# Burst size of the rate limiters, in seconds of sustained throughput
+RATE_LIMIT_BURST_SECONDS = 10
+
+# Adaptive (AIMD) concurrency window of in-flight requests per API service
+AIMD_INITIAL_WINDOW = 8
+AIMD_MIN_WINDOW = 1
+AIMD_MAX_WINDOW = 64
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_THROTTLE_STATUS_CODES = [429, 503]
+# The window shrinks once the p95 latency exceeds its healthy baseline by this factor
+AIMD_LATENCY_TOLERANCE = 2.0
+AIMD_LATENCY_SAMPLES = 50
+# The baseline follows the lowest p95 seen and relaxes by this factor per response,
+# so a one-off fast period does not keep the window down for the life of the worker
+AIMD_BASELINE_DECAY = 1.01
+# A request waits at most this long for a slot, then goes out anyway
+AIMD_ACQUIRE_TIMEOUT = 60
+
+# Bulk last activity lookups: principals per Logging filter and entries per page
+LOG_FILTER_MAX_PRINCIPALS = 50
+LOG_BULK_PAGE_SIZE = 1000
+
+# Windows in days searched one after another by the probing log search strategy
+LOG_PROBE_WINDOW_DAYS = [1, 7, 31, 92, 183, 365]
+
+# Last activity cache TTL in seconds (0 disables it); accounts checked within the TTL
+# only search the logs written since that check, overlapping by ACTIVITY_CACHE_OVERLAP
+ACTIVITY_CACHE_TTL = 7 * 24 * 3600
+ACTIVITY_CACHE_OVERLAP = 600
+
+# Predefined role catalog TTL in seconds; after it, the catalog is revalidated by etag
+# (0 revalidates on every collect). Decoded roles kept in memory and rows read per page
+ROLE_CATALOG_TTL = 24 * 3600
+ROLE_CATALOG_MEMORY_SIZE = 256
+ROLE_CATALOG_PAGE_SIZE = 100
+
+# Maximum number of HTTP/2 connections shared by async connectors
+ASYNC_MAX_CONNECTIONS = 10
+
+# Maximum number of in-flight requests multiplexed by async connectors
+ASYNC_MAX_CONCURRENT_REQUESTS = 100
+
+# Maximum number of responses buffered when resource managers run concurrently
+MANAGER_QUEUE_SIZE = 100
+
+# Default project filter applied while crawling the organization hierarchy
+DEFAULT_PROJECT_FILTER = {
+    "include_project_ids": [],
+    "exclude_project_ids": ["^sys-"],  # Apps Script managed projects
+    "labels": {},
+    "lifecycle_states": ["ACTIVE"],
+}
+
 # Region Information
 REGION_INFO = {
     "asia-east1": {
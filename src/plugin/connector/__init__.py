@@ -1,17 +1,40 @@
+import functools
 import logging
 import os
+import threading
+from typing import TYPE_CHECKING, Callable, Generator
 
-import google.oauth2.service_account
-import googleapiclient
-import googleapiclient.discovery
-import httplib2
-import socks
-from google_auth_httplib2 import AuthorizedHttp
 from spaceone.core.connector import BaseConnector
+from spaceone.core.error import ERROR_BASE
+
+from plugin.conf.global_conf import BATCH_MAX_REQUESTS
+from plugin.utils.concurrency import (
+    AdaptiveConcurrencyLimiter,
+    get_concurrency_limiter,
+)
+from plugin.utils.error_handlers import (
+    api_retry_handler,
+    is_circuit_breaker_open,
+    is_retryable_error,
+    open_circuit_breaker,
+)
+from plugin.utils.rate_limiter import TokenBucket, get_token_bucket
+from plugin.utils.secret import get_secret_digest
+
+if TYPE_CHECKING:
+    from plugin.connector.client_pool import ClientPool
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class ERROR_GOOGLE_API_LISTING_INCOMPLETE(ERROR_BASE):
+    _status_code = "UNAVAILABLE"
+    _message = (
+        "{api} API listing of {items_key} failed after {count} items, "
+        "the listing is incomplete"
+    )
+
+
 class GoogleCloudConnector(BaseConnector):
     google_client_service = None
     version = None
@@ -19,40 +42,196 @@ class GoogleCloudConnector(BaseConnector):
     def __init__(self, options: dict, secret_data: dict, schema: str, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.project_id = secret_data["project_id"]
-        self.credentials = (
-            google.oauth2.service_account.Credentials.from_service_account_info(
-                secret_data
-            )
+        # e.g. {"cloudasset": "http://localhost:8080/"} to use a local stand-in server
+        self.api_endpoint = (options.get("api_endpoints") or {}).get(
+            self.google_client_service
         )
+        # google.auth and httplib2 load with the first connector, not at server start
+        from plugin.utils.token_cache import get_shared_credentials
 
-        proxy_http = self._create_http_client()
-        if proxy_http:
-            self.client = googleapiclient.discovery.build(
-                self.google_client_service,
-                self.version,
-                http=AuthorizedHttp(
-                    self.credentials.with_scopes(
-                        [
-                            "https://www.googleapis.com/auth/cloud-platform"
-                        ]  # FOR PROXY SCOPE SUPPORT
-                    ),
-                    http=proxy_http,
-                ),
-            )
-        else:
-            self.client = googleapiclient.discovery.build(
+        # Access tokens are shared with every connector of the same service account key
+        self.credentials = get_shared_credentials(secret_data)
+        self.secret_digest = get_secret_digest(secret_data)
+        # API quotas are charged to the project of the collector's service account
+        self.token_bucket = get_token_bucket(
+            self.google_client_service, self.project_id, options
+        )
+        self._local = threading.local()
+
+    @property
+    def client(self):
+        # httplib2 is not thread-safe, so each thread leases its own pooled client
+        lease = getattr(self._local, "lease", None)
+        if lease is None or lease.released:
+            lease = self._local.lease = self._get_client_pool().acquire()
+        return lease.client
+
+    def reset_client(self) -> None:
+        # Drop this thread's client instead of returning it to the pool
+        lease = getattr(self._local, "lease", None)
+        if lease is not None:
+            lease.release(discard=True)
+            self._local.lease = None
+
+    def _get_client_pool(self) -> "ClientPool":
+        from plugin.connector.client_pool import ClientPool
+
+        https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
+        # Authorized transports are only reused by the exact same secret
+        key = (
+            self.google_client_service,
+            self.version,
+            self.secret_digest,
+            self.project_id,
+            self.api_endpoint,
+            https_proxy,
+        )
+        return ClientPool.get_pool(
+            key,
+            functools.partial(
+                self._build_client,
                 self.google_client_service,
                 self.version,
-                credentials=self.credentials,
+                self.credentials,
+                self.api_endpoint,
+                self.token_bucket,
+                get_concurrency_limiter(self.google_client_service),
+            ),
+        )
+
+    def paginate(
+        self, request, list_next: Callable, items_key: str, project_id: str = None
+    ) -> Generator[dict, None, None]:
+        # Yields items page by page. A page that keeps failing raises, so a partial
+        # listing is never taken for a complete one
+        count = 0
+        while request is not None:
+            response = self.execute_page(request, project_id=project_id)
+            if response is None:
+                self.raise_incomplete_listing(items_key, count, project_id)
+                return
+            items = response.get(items_key, [])
+            count += len(items)
+            yield from items
+            request = list_next(previous_request=request, previous_response=response)
+
+    def raise_incomplete_listing(
+        self, items_key: str, count: int, project_id: str = None
+    ) -> None:
+        # Calls cut by an open circuit breaker are reported with the breaker instead
+        if is_circuit_breaker_open(self, project_id or self.project_id, skip=False):
+            return
+        raise ERROR_GOOGLE_API_LISTING_INCOMPLETE(
+            api=self.google_client_service, items_key=items_key, count=count
+        )
+
+    @api_retry_handler(default_response=None)
+    def execute_page(self, request, project_id: str = None):
+        # project_id only scopes the circuit breaker of api_retry_handler
+        return request.execute()
+
+    def execute_batch(self, requests: dict, project_id: str = None) -> dict:
+        # Returns responses keyed like `requests`. Sub-requests that failed for good
+        # map to None; transient failures are left out so callers can retry them alone.
+        # project_id scopes the circuit breaker like it does for api_retry_handler
+        responses = {}
+        items = list(requests.items())
+        project_scoped = project_id is not None
+        project_id = project_id or self.project_id
+
+        for offset in range(0, len(items), BATCH_MAX_REQUESTS):
+            chunk = items[offset : offset + BATCH_MAX_REQUESTS]
+            if is_circuit_breaker_open(self, project_id):
+                for key, _ in chunk:
+                    responses[key] = None
+                continue
+
+            def _callback(request_id, response, exception):
+                key = chunk[int(request_id)][0]
+                if exception is None:
+                    responses[key] = response
+                    return
+
+                _LOGGER.debug(
+                    f"{self.__repr__()} Batch sub-request failed ({key}): {exception}"
+                )
+                open_circuit_breaker(self, exception, project_id, project_scoped)
+                if not is_retryable_error(exception):
+                    responses[key] = None
+
+            batch = self._new_batch_http_request()
+            for index, (key, request) in enumerate(chunk):
+                batch.add(request, callback=_callback, request_id=str(index))
+
+            if self.token_bucket is not None:
+                # Quotas count sub-requests, the batch itself is paced by ThrottledHttp
+                self.token_bucket.acquire(len(chunk) - 1)
+
+            try:
+                batch.execute()
+            except Exception as e:
+                _LOGGER.debug(f"{self.__repr__()} Batch request failed: {e}")
+                open_circuit_breaker(self, e, project_id, project_scoped)
+
+        return responses
+
+    def _new_batch_http_request(self):
+        if self.api_endpoint:
+            from googleapiclient.http import BatchHttpRequest
+
+            return BatchHttpRequest(batch_uri=f"{self.api_endpoint.rstrip('/')}/batch")
+        return self.client.new_batch_http_request()
+
+    @classmethod
+    def _build_client(
+        cls,
+        service: str,
+        version: str,
+        credentials,
+        api_endpoint: str,
+        token_bucket: TokenBucket,
+        concurrency_limiter: AdaptiveConcurrencyLimiter,
+    ):
+        # googleapiclient takes a large share of the startup time, so it is only
+        # imported once the first client is built
+        import googleapiclient.discovery
+        import googleapiclient.http
+
+        from plugin.connector.client_pool import ThrottledHttp
+        from plugin.connector.discovery_documents import get_discovery_document
+
+        client_options = None
+        if api_endpoint:
+            client_options = {"api_endpoint": api_endpoint}
+
+        http = ThrottledHttp(
+            credentials,
+            http=cls._create_http_client() or googleapiclient.http.build_http(),
+            token_bucket=token_bucket,
+            concurrency_limiter=concurrency_limiter,
+        )
+
+        # Only the transport differs between clients, the parsed document is shared
+        document = get_discovery_document(service, version)
+        if document is None:
+            return googleapiclient.discovery.build(
+                service, version, client_options=client_options, http=http
             )
+        return googleapiclient.discovery.build_from_document(
+            document, client_options=client_options, http=http
+        )
 
-    def _create_http_client(self):
+    @staticmethod
+    def _create_http_client():
         https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
 
         if https_proxy:
             # _LOGGER.info(
             #     f"** Using proxy in environment variable HTTPS_PROXY/https_proxy: {https_proxy}"
             # ) # TOO MANY LOGGING
+            import httplib2
+            import socks
+
             try:
                 proxy_url = https_proxy.replace("http://", "").replace("https://", "")
                 if ":" in proxy_url:
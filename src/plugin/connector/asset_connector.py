@@ -0,0 +1,56 @@
+import logging
+from spaceone.core.error import ERROR_INTERNAL_API
+from plugin.connector import GoogleCloudConnector
+from plugin.utils.error_handlers import api_retry_handler
+
+__all__ = ["AssetConnector"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AssetConnector(GoogleCloudConnector):
+    google_client_service = "cloudasset"
+    version = "v1"
+
+    def search_all_iam_policies(self, scope: str, asset_types: list = None):
+        query = {"scope": scope, "pageSize": 500}
+        if asset_types:
+            query["assetTypes"] = asset_types
+
+        request = self.client.v1().searchAllIamPolicies(**query)
+        while request is not None:
+            response = self._execute(request)
+            if response is None:
+                raise ERROR_INTERNAL_API(
+                    message=f"Failed to search IAM policies in {scope}"
+                )
+
+            yield from response.get("results", [])
+
+            request = self.client.v1().searchAllIamPolicies_next(
+                previous_request=request, previous_response=response
+            )
+
+    def list_assets(self, parent: str, asset_types: list):
+        query = {
+            "parent": parent,
+            "assetTypes": asset_types,
+            "contentType": "RESOURCE",
+            "pageSize": 1000,
+        }
+
+        request = self.client.assets().list(**query)
+        while request is not None:
+            response = self._execute(request)
+            if response is None:
+                raise ERROR_INTERNAL_API(message=f"Failed to list assets in {parent}")
+
+            yield from response.get("assets", [])
+
+            request = self.client.assets().list_next(
+                previous_request=request, previous_response=response
+            )
+
+    @api_retry_handler(default_response=None)
+    def _execute(self, request):
+        return request.execute()
@@ -0,0 +1,173 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from spaceone.core.connector import BaseConnector
+from spaceone.core.error import ERROR_CONFIGURATION
+
+from plugin.conf.global_conf import ASYNC_MAX_CONNECTIONS
+from plugin.utils.concurrency import get_concurrency_limiter
+from plugin.utils.rate_limiter import get_token_bucket
+
+__all__ = ["AsyncGoogleCloudConnector", "run_async", "gather_with_limit"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_EVENT_LOOP = None
+_EVENT_LOOP_LOCK = threading.Lock()
+
+
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    global _EVENT_LOOP
+    with _EVENT_LOOP_LOCK:
+        if _EVENT_LOOP is None:
+            _EVENT_LOOP = asyncio.new_event_loop()
+            threading.Thread(
+                target=_EVENT_LOOP.run_forever, name="async-connector", daemon=True
+            ).start()
+        return _EVENT_LOOP
+
+
+def run_async(coroutine):
+    # Sync facade: runs the coroutine on the shared event loop and waits for it
+    context = contextvars.copy_context()
+
+    async def _run():
+        # Carry the caller's collect scopes (e.g. the retry budget) over to the loop
+        for var, value in context.items():
+            var.set(value)
+        return await coroutine
+
+    return asyncio.run_coroutine_threadsafe(_run(), _get_event_loop()).result()
+
+
+async def gather_with_limit(coroutines: list, limit: int) -> list:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _run(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    return await asyncio.gather(*[_run(coroutine) for coroutine in coroutines])
+
+
+class AsyncGoogleCloudConnector(BaseConnector):
+    google_client_service = None
+    version = None
+    _http_client = None
+    _http_client_lock = threading.Lock()
+
+    def __init__(self, options: dict, secret_data: dict, schema: str, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.project_id = secret_data["project_id"]
+        from plugin.utils.token_cache import get_shared_credentials
+
+        self.credentials = get_shared_credentials(secret_data)
+        # Shared with the sync connectors of the same API and quota project
+        self.token_bucket = get_token_bucket(
+            self.google_client_service, self.project_id, options
+        )
+        self.concurrency_limiter = get_concurrency_limiter(self.google_client_service)
+
+        api_endpoint = (options.get("api_endpoints") or {}).get(
+            self.google_client_service
+        ) or f"https://{self.google_client_service}.googleapis.com/"
+        self.base_url = f"{api_endpoint.rstrip('/')}/{self.version}/"
+        self._token_request = None
+        self._token_request_lock = threading.Lock()
+
+    async def request(
+        self, method: str, path: str, params: dict = None, body: dict = None
+    ) -> dict:
+        if self.token_bucket is not None:
+            await asyncio.sleep(self.token_bucket.reserve())
+
+        headers = await asyncio.to_thread(self._get_auth_headers)
+
+        # Polls instead of blocking, the event loop serves every async connector
+        while not self.concurrency_limiter.try_acquire():
+            await asyncio.sleep(0.05)
+        started_at = time.monotonic()
+        status = None
+        try:
+            response = await self._get_http_client().request(
+                method, self.base_url + path, params=params, json=body, headers=headers
+            )
+            status = response.status_code
+        finally:
+            self.concurrency_limiter.release(time.monotonic() - started_at, status)
+
+        response.raise_for_status()
+        return response.json()
+
+    async def paginate(
+        self,
+        method: str,
+        path: str,
+        items_key: str,
+        params: dict = None,
+        body: dict = None,
+    ) -> list:
+        items = []
+        params = dict(params or {})
+        body = dict(body) if body is not None else None
+        while True:
+            response = await self.request(method, path, params=params, body=body)
+            items.extend(response.get(items_key, []))
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                break
+
+            if body is not None:
+                body["pageToken"] = page_token
+            else:
+                params["pageToken"] = page_token
+
+        return items
+
+    def _get_auth_headers(self) -> dict:
+        # One transport per connector for token refreshes, which the credentials
+        # serialize. httplib2 picks up HTTPS_PROXY/https_proxy from the environment
+        import google_auth_httplib2
+        import httplib2
+
+        with self._token_request_lock:
+            if self._token_request is None:
+                self._token_request = google_auth_httplib2.Request(httplib2.Http())
+        token = self.credentials.get_token(self._token_request)
+        return {"Authorization": f"Bearer {token}"}
+
+    @classmethod
+    def _get_http_client(cls):
+        # One HTTP/2 client per process; requests are multiplexed on its connections
+        with AsyncGoogleCloudConnector._http_client_lock:
+            if AsyncGoogleCloudConnector._http_client is None:
+                AsyncGoogleCloudConnector._http_client = cls._create_http_client()
+            return AsyncGoogleCloudConnector._http_client
+
+    @staticmethod
+    def _create_http_client():
+        try:
+            import httpx
+        except ImportError:
+            raise ERROR_CONFIGURATION(key="httpx[http2] is required for HTTP/2")
+
+        https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
+        proxy = None
+        if https_proxy:
+            proxy = https_proxy if "://" in https_proxy else f"http://{https_proxy}"
+
+        # Certificates are not verified through a proxy, like
+        # disable_ssl_certificate_validation of the sync connectors
+        return httpx.AsyncClient(
+            http2=True,
+            proxy=proxy,
+            verify=proxy is None,
+            trust_env=False,
+            limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS),
+            timeout=httpx.Timeout(60.0),
+        )
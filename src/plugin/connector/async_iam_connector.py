@@ -0,0 +1,28 @@
+import logging
+from plugin.connector.async_connector import AsyncGoogleCloudConnector
+from plugin.utils.error_handlers import async_api_retry_handler
+
+__all__ = ["AsyncIAMConnector"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncIAMConnector(AsyncGoogleCloudConnector):
+    google_client_service = "iam"
+    version = "v1"
+
+    @async_api_retry_handler(default_response=[])
+    async def list_service_account_keys(
+        self, service_account_email: str, project_id: str = None
+    ) -> list:
+        project_id = project_id or self.project_id
+        response = await self.request(
+            "GET", f"projects/{project_id}/serviceAccounts/{service_account_email}/keys"
+        )
+
+        keys = response.get("keys", [])
+        return list(filter(lambda x: x.get("keyType") == "USER_MANAGED", keys))
+
+    @async_api_retry_handler(default_response={})
+    async def get_role(self, name: str) -> dict:
+        return await self.request("GET", name)
@@ -0,0 +1,74 @@
+import logging
+from datetime import datetime
+
+from plugin.connector.async_connector import AsyncGoogleCloudConnector
+from plugin.connector.logging_connector import (
+    get_search_start_time,
+    get_search_windows,
+    get_service_account_filter_str,
+)
+from plugin.utils.error_handlers import async_api_retry_handler
+
+__all__ = ["AsyncLoggingConnector"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class AsyncLoggingConnector(AsyncGoogleCloudConnector):
+    google_client_service = "logging"
+    version = "v2"
+
+    def __init__(self, options: dict, secret_data: dict, schema: str, *args, **kwargs):
+        super().__init__(
+            options=options, secret_data=secret_data, schema=schema, *args, **kwargs
+        )
+        self.log_search_period = options.get("log_search_period", "3 Months")
+        self.log_search_strategy = options.get("log_search_strategy", "single")
+
+    async def get_last_log_entry_timestamp(
+        self,
+        project_id: str,
+        service_account_email: str,
+        service_account_key_name: str = None,
+    ):
+        time_now = datetime.utcnow()
+        search_windows = get_search_windows(
+            self.log_search_strategy,
+            get_search_start_time(self.log_search_period, time_now),
+            time_now,
+        )
+        for start_time, end_time in search_windows:
+            log_entries = await self._list_entries_service_accounts(
+                project_id,
+                service_account_email,
+                service_account_key_name,
+                start_time,
+                end_time,
+            )
+            if log_entries:
+                return log_entries[0].get("timestamp")
+
+        return None
+
+    @async_api_retry_handler(default_response=[])
+    async def _list_entries_service_accounts(
+        self,
+        project_id: str,
+        service_account_email: str,
+        service_account_key_name,
+        start_time: str,
+        end_time: str,
+    ) -> list:
+        filter_str = get_service_account_filter_str(
+            service_account_email, service_account_key_name
+        )
+        filter_str += f' AND timestamp >= "{start_time}" AND timestamp <= "{end_time}"'
+
+        body = {
+            "resourceNames": [f"projects/{project_id}"],
+            "orderBy": "timestamp desc",
+            "pageSize": 1,
+            "filter": filter_str,
+        }
+        response = await self.request("POST", "entries:list", body=body)
+        return response.get("entries", [])
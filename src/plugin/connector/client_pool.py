@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+from google_auth_httplib2 import AuthorizedHttp
+
+from plugin.conf.global_conf import (
+    CLIENT_POOL_MAX_IDLE,
+    CLIENT_POOL_MAX_POOLS,
+    SECRET_CACHE_IDLE_TTL,
+)
+
+__all__ = ["ClientPool", "ThrottledHttp", "client_lease_scope"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_CLIENT_LEASES = ContextVar("client_leases", default=None)
+
+
+class ThrottledHttp(AuthorizedHttp):
+    def __init__(
+        self,
+        credentials,
+        http=None,
+        token_bucket=None,
+        concurrency_limiter=None,
+        **kwargs,
+    ):
+        super().__init__(credentials, http=http, **kwargs)
+        self.token_bucket = token_bucket
+        self.concurrency_limiter = concurrency_limiter
+        # Only the transport is throttled. AuthorizedHttp.request calls itself again to
+        # retry after a 401 refresh, so a slot held across it would be taken twice
+        self.http = _ThrottledTransport(self.http, token_bucket, concurrency_limiter)
+
+
+class _ThrottledTransport:
+    def __init__(self, http, token_bucket=None, concurrency_limiter=None):
+        self._http = http
+        self._token_bucket = token_bucket
+        self._concurrency_limiter = concurrency_limiter
+
+    def __getattr__(self, name):
+        # connections, timeout, close() and so on are those of the wrapped Http
+        return getattr(self._http, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+        else:
+            setattr(self._http, name, value)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        # Every execute() of a discovery request ends up here
+        if self._token_bucket is not None:
+            self._token_bucket.acquire()
+        if self._concurrency_limiter is None:
+            return self._http.request(uri, method, body=body, headers=headers, **kwargs)
+
+        self._concurrency_limiter.acquire()
+        started_at = time.monotonic()
+        status = None
+        try:
+            response, content = self._http.request(
+                uri, method, body=body, headers=headers, **kwargs
+            )
+            status = response.status
+            return response, content
+        finally:
+            self._concurrency_limiter.release(time.monotonic() - started_at, status)
+
+
+class ClientLease:
+    def __init__(self, pool: "ClientPool", client):
+        self.pool = pool
+        self.client = client
+        self.released = False
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ClientLease":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+    def __del__(self):
+        # Fallback for leases taken outside a client_lease_scope
+        self.release()
+
+    def release(self, discard: bool = False) -> None:
+        with self._lock:
+            if self.released:
+                return
+            self.released = True
+        if not discard:
+            self.pool.release(self.client)
+
+
+class _LeaseRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leases = []
+
+    def add(self, lease: ClientLease) -> None:
+        with self._lock:
+            self._leases.append(lease)
+
+    def release_all(self) -> None:
+        with self._lock:
+            leases, self._leases = self._leases, []
+        for lease in leases:
+            lease.release()
+
+
+@contextmanager
+def client_lease_scope():
+    # Every client leased in this scope, by any worker thread of the collect, goes
+    # back to its pool when the scope exits
+    previous = _CLIENT_LEASES.get()
+    leases = _LeaseRegistry()
+    _CLIENT_LEASES.set(leases)
+    try:
+        yield leases
+    finally:
+        _CLIENT_LEASES.set(previous)
+        leases.release_all()
+
+
+class ClientPool:
+    _pools = OrderedDict()
+    _pools_lock = threading.Lock()
+
+    def __init__(self, key: tuple, factory: Callable, max_idle: int):
+        self.key = key
+        self.factory = factory
+        self.max_idle = max_idle
+        self.created = 0
+        self.used_at = time.monotonic()
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_pool(
+        cls, key: tuple, factory: Callable, max_idle: int = CLIENT_POOL_MAX_IDLE
+    ) -> "ClientPool":
+        now = time.monotonic()
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = cls(key, factory, max_idle)
+            else:
+                cls._pools.move_to_end(key)
+            pool.used_at = now
+            evicted = cls._evict_pools(now)
+
+        for evicted_pool in evicted:
+            evicted_pool.close()
+        return pool
+
+    @classmethod
+    def _evict_pools(cls, now: float) -> list:
+        # Least recently used first, so eviction stops at the first pool still in use
+        evicted = []
+        while cls._pools:
+            key, pool = next(iter(cls._pools.items()))
+            if (
+                len(cls._pools) <= CLIENT_POOL_MAX_POOLS
+                and now - pool.used_at < SECRET_CACHE_IDLE_TTL
+            ):
+                break
+            del cls._pools[key]
+            evicted.append(pool)
+        return evicted
+
+    def acquire(self) -> ClientLease:
+        # Most recently used clients first, their keep-alive connections are warm
+        with self._lock:
+            client = self._idle.pop() if self._idle else None
+
+        if client is None:
+            client = self.factory()
+            with self._lock:
+                self.created += 1
+            _LOGGER.debug(
+                f"[ClientPool] Created client {self.created} for {self.key[:2]}"
+            )
+
+        lease = ClientLease(self, client)
+        leases = _CLIENT_LEASES.get()
+        if leases is not None:
+            leases.add(lease)
+        return lease
+
+    def release(self, client) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(client)
+
+    def close(self) -> None:
+        # Clients still leased go back to this orphaned pool and are dropped with it
+        with self._lock:
+            clients, self._idle = self._idle, []
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                _LOGGER.debug(f"[ClientPool] Failed to close a client: {e}")
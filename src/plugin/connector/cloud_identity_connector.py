@@ -1,6 +1,7 @@
 import logging
+from typing import Generator
 from plugin.connector import GoogleCloudConnector
-from plugin.utils.error_handlers import api_retry_handler
+from plugin.utils.request_cache import collect_cache
 
 
 __all__ = ["CloudIdentityConnector"]
@@ -12,42 +13,27 @@ class CloudIdentityConnector(GoogleCloudConnector):
     google_client_service = "cloudidentity"
     version = "v1"
 
-    @api_retry_handler(default_response=[])
-    def list_groups(self, customer_id):
-        groups = []
+    @collect_cache
+    def list_groups(self, customer_id) -> list:
+        return list(self.iter_groups(customer_id))
+
+    def iter_groups(self, customer_id) -> Generator[dict, None, None]:
         parent = f"customers/{customer_id}"
-        request = self.client.groups().list(parent=parent, pageSize=1000)
-        while True:
-            response = request.execute()
-            groups.extend(response.get("groups", []))
-            request = self.client.groups().list_next(
-                previous_request=request, previous_response=response
-            )
-            if request is None:
-                break
-        return groups
-
-    @api_retry_handler(default_response=[])
-    def list_memberships(self, parent):
-        memberships = []
-        request = (
-            self.client.groups()
-            .memberships()
-            .list(parent=parent, pageSize=500, view="FULL")
+        return self.paginate(
+            self.client.groups().list(parent=parent, pageSize=1000),
+            self.client.groups().list_next,
+            "groups",
         )
 
-        while True:
-            response = request.execute()
-
-            memberships.extend(response.get("memberships", []))
-
-            request = (
-                self.client.groups()
-                .memberships()
-                .list_next(previous_request=request, previous_response=response)
-            )
+    @collect_cache
+    def list_memberships(self, parent) -> list:
+        return list(self.iter_memberships(parent))
 
-            if request is None:
-                break
-
-        return memberships
+    def iter_memberships(self, parent) -> Generator[dict, None, None]:
+        return self.paginate(
+            self.client.groups()
+            .memberships()
+            .list(parent=parent, pageSize=500, view="FULL"),
+            self.client.groups().memberships().list_next,
+            "memberships",
+        )
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import threading
+
+import googleapiclient.discovery
+import httplib2
+from googleapiclient.discovery_cache import get_static_doc
+
+from plugin.conf.global_conf import DISCOVERY_DOCUMENT_DIR
+
+__all__ = ["get_discovery_document"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_DOCUMENTS = {}
+_DOCUMENTS_LOCK = threading.Lock()
+
+
+def get_discovery_document(service: str, version: str):
+    # Parsed once per process; None when no document is available offline
+    with _DOCUMENTS_LOCK:
+        if (service, version) not in _DOCUMENTS:
+            _DOCUMENTS[(service, version)] = _load_discovery_document(service, version)
+        return _DOCUMENTS[(service, version)]
+
+
+def _load_discovery_document(service: str, version: str):
+    # Documents in DISCOVERY_DOCUMENT_DIR (e.g. iam.v1.json) take precedence over
+    # the ones bundled with google-api-python-client
+    content = None
+    if DISCOVERY_DOCUMENT_DIR:
+        path = os.path.join(DISCOVERY_DOCUMENT_DIR, f"{service}.{version}.json")
+        try:
+            with open(path, "r") as f:
+                content = f.read()
+        except FileNotFoundError:
+            pass
+    if content is None:
+        content = get_static_doc(service, version)
+
+    if content is None:
+        _LOGGER.debug(f"[Discovery] No offline document for {service} {version}")
+        return None
+
+    document = json.loads(content)
+    _fix_up_document(document)
+    return document
+
+
+def _fix_up_document(document: dict) -> None:
+    # Building a client fills in the method descriptions of the document in place.
+    # Doing it for every resource once, before the document is shared, keeps later
+    # builds on other threads from resizing dicts that are being read
+    client = googleapiclient.discovery.build_from_document(
+        document, http=httplib2.Http()
+    )
+    _touch_resources(client, document)
+
+
+def _touch_resources(resource, resource_desc: dict) -> None:
+    for name, nested_resource_desc in resource_desc.get("resources", {}).items():
+        method_name = googleapiclient.discovery.fix_method_name(name)
+        _touch_resources(getattr(resource, method_name)(), nested_resource_desc)
@@ -1,7 +1,9 @@
 import logging
+from typing import Generator
 from spaceone.core import cache
 from plugin.connector import GoogleCloudConnector
 from plugin.utils.error_handlers import api_retry_handler
+from plugin.utils.request_cache import collect_cache
 
 __all__ = ["IAMConnector"]
 
@@ -12,28 +14,23 @@ class IAMConnector(GoogleCloudConnector):
     google_client_service = "iam"
     version = "v1"
 
-    @api_retry_handler(default_response=[])
+    @collect_cache
     def list_service_accounts(self, project_id: str = None) -> list:
-        project_id = project_id or self.project_id
-        service_accounts = []
+        return list(self.iter_service_accounts(project_id))
 
+    def iter_service_accounts(
+        self, project_id: str = None
+    ) -> Generator[dict, None, None]:
+        project_id = project_id or self.project_id
         query = {"name": f"projects/{project_id}", "pageSize": 100}
-        request = self.client.projects().serviceAccounts().list(**query)
-
-        while True:
-            response = request.execute()
-            service_accounts.extend(response.get("accounts", []))
-            request = (
-                self.client.projects()
-                .serviceAccounts()
-                .list_next(previous_request=request, previous_response=response)
-            )
-
-            if request is None:
-                break
-
-        return service_accounts
+        return self.paginate(
+            self.client.projects().serviceAccounts().list(**query),
+            self.client.projects().serviceAccounts().list_next,
+            "accounts",
+            project_id,
+        )
 
+    @collect_cache
     @api_retry_handler(default_response=[])
     def list_service_account_keys(
         self, service_account_email: str, project_id: str = None
@@ -48,91 +45,135 @@ class IAMConnector(GoogleCloudConnector):
         keys = response.get("keys", [])
         return list(filter(lambda x: x.get("keyType") == "USER_MANAGED", keys))
 
-    @api_retry_handler(default_response=[])
-    def query_testable_permissions(self, resource: str):
+    @collect_cache
+    def list_service_account_keys_batch(
+        self, service_account_emails: list, project_id: str = None
+    ) -> dict:
+        project_id = project_id or self.project_id
+        requests = {
+            email: self.client.projects()
+            .serviceAccounts()
+            .keys()
+            .list(name=f"projects/{project_id}/serviceAccounts/{email}")
+            for email in service_account_emails
+        }
+        responses = self.execute_batch(requests, project_id)
+
+        service_account_keys = {}
+        for email in requests:
+            if email in responses:
+                # None (e.g. the account was deleted meanwhile) is not looked up again
+                keys = (responses[email] or {}).get("keys", [])
+                service_account_keys[email] = list(
+                    filter(lambda x: x.get("keyType") == "USER_MANAGED", keys)
+                )
+            else:
+                service_account_keys[email] = self.list_service_account_keys(
+                    email, project_id
+                )
+
+        return service_account_keys
+
+    @collect_cache
+    def query_testable_permissions(self, resource: str) -> list:
+        return list(self.iter_testable_permissions(resource))
+
+    def iter_testable_permissions(self, resource: str) -> Generator[dict, None, None]:
         body = {"fullResourceName": resource}
-        permissions = []
+        count = 0
 
         while True:
             request = self.client.permissions().queryTestablePermissions(body=body)
-            response = request.execute()
-            permissions.extend(response.get("permissions", []))
+            response = self.execute_page(request)
+            if response is None:
+                self.raise_incomplete_listing("permissions", count)
+                return
+            permissions = response.get("permissions", [])
+            count += len(permissions)
+            yield from permissions
 
             if "nextPageToken" not in response:
                 break
 
             body["pageToken"] = response["nextPageToken"]
 
-        return permissions
+    @collect_cache
+    def list_project_roles(self, project_id: str = None) -> list:
+        return list(self.iter_project_roles(project_id))
 
-    @api_retry_handler(default_response=[])
-    def list_project_roles(self, project_id: str = None):
+    def iter_project_roles(self, project_id: str = None) -> Generator[dict, None, None]:
         parent = f"projects/{project_id}"
-        roles = []
-        request = (
+        return self.paginate(
             self.client.projects()
             .roles()
-            .list(parent=parent, pageSize=1000, view="FULL")
+            .list(parent=parent, pageSize=1000, view="FULL"),
+            self.client.projects().roles().list_next,
+            "roles",
+            project_id,
         )
 
-        while True:
-            response = request.execute()
-
-            roles.extend(response.get("roles", []))
-
-            request = (
-                self.client.projects()
-                .roles()
-                .list_next(previous_request=request, previous_response=response)
-            )
-
-            if request is None:
-                break
-
-        return roles
+    @collect_cache
+    def list_organization_roles(self, resource) -> list:
+        return list(self.iter_organization_roles(resource))
 
-    @api_retry_handler(default_response=[])
-    def list_organization_roles(self, resource):
-        roles = []
-        request = (
+    def iter_organization_roles(self, resource) -> Generator[dict, None, None]:
+        return self.paginate(
             self.client.organizations()
             .roles()
-            .list(parent=resource, pageSize=1000, view="FULL")
+            .list(parent=resource, pageSize=1000, view="FULL"),
+            self.client.organizations().roles().list_next,
+            "roles",
         )
 
-        while True:
-            response = request.execute()
-            roles.extend(response.get("roles", []))
-
-            request = (
-                self.client.organizations()
-                .roles()
-                .list_next(previous_request=request, previous_response=response)
-            )
-
-            if request is None:
-                break
-
-        return roles
-
-    @api_retry_handler(default_response=[])
-    def list_roles(self):
-        roles = []
-        request = self.client.roles().list(pageSize=1000, view="FULL")
-        while True:
-            response = request.execute()
-            roles.extend(response.get("roles", []))
+    def list_roles(self) -> list:
+        # Not kept per collect, see iter_roles
+        return list(self.iter_roles())
+
+    def iter_roles(self) -> Generator[dict, None, None]:
+        # Predefined roles with their permissions, one page of 1000 roles at a time.
+        # Too large to keep per collect; the role catalog serves repeated lookups
+        return self.paginate(
+            self.client.roles().list(pageSize=1000, view="FULL"),
+            self.client.roles().list_next,
+            "roles",
+        )
 
+    def list_role_etags(self):
+        # None when a page can not be fetched, so a partial listing is never mistaken
+        # for roles having been deleted
+        role_etags = {}
+        request = self.client.roles().list(
+            pageSize=1000, view="BASIC", fields="roles(name,etag),nextPageToken"
+        )
+        while request is not None:
+            response = self.execute_page(request)
+            if response is None:
+                return None
+            for role in response.get("roles", []):
+                role_etags[role["name"]] = role.get("etag")
             request = self.client.roles().list_next(
                 previous_request=request, previous_response=response
             )
 
-            if request is None:
-                break
-
-        return roles
+        return role_etags
 
+    @collect_cache
     @api_retry_handler(default_response={})
     @cache.cacheable(key="plugin:connector:role:{name}", alias="local")
     def get_role(self, name: str):
         return self.client.roles().get(name=name).execute()
+
+    @collect_cache
+    def get_roles_batch(self, names: list) -> dict:
+        # Roles whose lookup failed for good map to None
+        requests = {name: self.client.roles().get(name=name) for name in names}
+        responses = self.execute_batch(requests)
+
+        roles = {}
+        for name in requests:
+            if name in responses:
+                roles[name] = responses[name]
+            else:
+                roles[name] = self.get_role(name)
+
+        return roles
@@ -1,8 +1,17 @@
 import logging
+from plugin.conf.global_conf import (
+    ACTIVITY_CACHE_OVERLAP,
+    ACTIVITY_CACHE_TTL,
+    LOG_BULK_PAGE_SIZE,
+    LOG_FILTER_MAX_PRINCIPALS,
+    LOG_PROBE_WINDOW_DAYS,
+)
 from plugin.connector import GoogleCloudConnector
 from plugin.utils.error_handlers import api_retry_handler
+from plugin.utils.local_store import LocalStore
+from plugin.utils.request_cache import collect_cache
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 __all__ = ["LoggingConnector"]
 
@@ -12,13 +21,17 @@ _LOGGER = logging.getLogger("spaceone")
 class LoggingConnector(GoogleCloudConnector):
     google_client_service = "logging"
     version = "v2"
+    _activity_store = LocalStore("last_activity")
 
     def __init__(self, options: dict, secret_data: dict, schema: str, *args, **kwargs):
         super().__init__(
             options=options, secret_data=secret_data, schema=schema, *args, **kwargs
         )
         self.log_search_period = options.get("log_search_period", "3 Months")
+        self.activity_cache_ttl = options.get("activity_cache_ttl", ACTIVITY_CACHE_TTL)
+        self.log_search_strategy = options.get("log_search_strategy", "single")
 
+    @collect_cache
     @api_retry_handler(default_response=[])
     def list_entries(self, project_id: str) -> list:
         body = {
@@ -37,25 +50,39 @@ class LoggingConnector(GoogleCloudConnector):
         service_account_email: str,
         service_account_key_name: str = None,
     ):
-        log_entries = self._list_entries_service_accounts(
-            project_id, service_account_email, service_account_key_name
+        time_now = datetime.utcnow()
+        search_windows = get_search_windows(
+            self.log_search_strategy,
+            get_search_start_time(self.log_search_period, time_now),
+            time_now,
         )
-        if not log_entries:
-            return None
-        timestamp = log_entries[0].get("timestamp")
-        return timestamp
+        for start_time, end_time in search_windows:
+            log_entries = self._list_entries_service_accounts(
+                project_id,
+                service_account_email,
+                service_account_key_name,
+                start_time,
+                end_time,
+            )
+            if log_entries:
+                return log_entries[0].get("timestamp")
+
+        return None
 
+    @collect_cache
     @api_retry_handler(default_response=[])
     def _list_entries_service_accounts(
-        self, project_id: str, service_account_email: str, service_account_key_name
+        self,
+        project_id: str,
+        service_account_email: str,
+        service_account_key_name,
+        start_time: str,
+        end_time: str,
     ) -> list:
-        filter_str = (
-            f'protoPayload.authenticationInfo.principalEmail="{service_account_email}"'
+        filter_str = get_service_account_filter_str(
+            service_account_email, service_account_key_name
         )
-        if service_account_key_name:
-            resource_name = f"//iam.googleapis.com/{service_account_key_name}"
-            filter_str += f' AND protoPayload.authenticationInfo.serviceAccountKeyName="{resource_name}"'
-        filter_str += self._get_timestamp_filter_str(datetime.utcnow())
+        filter_str += f' AND timestamp >= "{start_time}" AND timestamp <= "{end_time}"'
 
         body = {
             "resourceNames": [f"projects/{project_id}"],
@@ -67,26 +94,208 @@ class LoggingConnector(GoogleCloudConnector):
         entries = response.get("entries", [])
         return entries
 
-    def _get_timestamp_filter_str(self, time_now: datetime) -> str:
-        if self.log_search_period == "1 Month":
-            log_search_period_in_days = 31
-        elif self.log_search_period == "3 Months":
-            log_search_period_in_days = 92
-        elif self.log_search_period == "6 Months":
-            log_search_period_in_days = 183
-        else:
-            log_search_period_in_days = 365
-
-        start_time, end_time = (
-            time_now - timedelta(days=log_search_period_in_days),
-            time_now,
+    def get_last_log_entry_timestamps(
+        self, project_id: str, service_account_emails: list
+    ) -> dict:
+        # Emails missing from the result could not be looked up in bulk
+        time_now = datetime.utcnow()
+        checked_at = time_now.replace(tzinfo=timezone.utc).timestamp()
+        emails = list(dict.fromkeys(service_account_emails))
+        # Another key of the same project may not see the same logs
+        cache_key = f"{self.secret_digest}:{project_id}:{self.log_search_period}"
+        cached = {}
+        if self.activity_cache_ttl:
+            stored = self._activity_store.get(cache_key) or {}
+            cached = {
+                email: stored[email]
+                for email in emails
+                if email in stored
+                and stored[email]["checkedAt"] > checked_at - self.activity_cache_ttl
+            }
+
+        # Accounts checked before only need the logs written since that check
+        search_start_time = get_search_start_time(self.log_search_period, time_now)
+        emails_by_start_time = {}
+        for email in emails:
+            start_time = search_start_time
+            if email in cached:
+                start_time = max(
+                    datetime.utcfromtimestamp(
+                        cached[email]["checkedAt"] - ACTIVITY_CACHE_OVERLAP
+                    ),
+                    search_start_time,
+                )
+            emails_by_start_time.setdefault(start_time, []).append(email)
+
+        last_activity_times = {}
+        for start_time, start_time_emails in emails_by_start_time.items():
+            for offset in range(0, len(start_time_emails), LOG_FILTER_MAX_PRINCIPALS):
+                last_activity_times.update(
+                    self._scan_last_log_entry_timestamps(
+                        project_id,
+                        start_time_emails[offset : offset + LOG_FILTER_MAX_PRINCIPALS],
+                        start_time,
+                        time_now,
+                    )
+                )
+
+        search_start_time_str = format_timestamp(search_start_time)
+        for email, last_activity_time in last_activity_times.items():
+            if last_activity_time is None and email in cached:
+                # Nothing new; keep the cached activity while it is inside the period
+                last_activity_time = cached[email]["lastActivityTime"]
+                if last_activity_time and last_activity_time < search_start_time_str:
+                    last_activity_time = None
+                last_activity_times[email] = last_activity_time
+
+            # Emails of a failed scan are missing here and keep their previous entry
+            cached[email] = {
+                "lastActivityTime": last_activity_time,
+                "checkedAt": checked_at,
+            }
+
+        if self.activity_cache_ttl:
+            self._activity_store.set(cache_key, cached)
+        return last_activity_times
+
+    def _scan_last_log_entry_timestamps(
+        self,
+        project_id: str,
+        service_account_emails: list,
+        start_time: datetime,
+        time_now: datetime,
+    ) -> dict:
+        # Newest-first scan of each window. A page that finds principals restarts the
+        # query without them, below the oldest entry seen, so the entries of a very
+        # active account are not paged through while others are still missing.
+        # Principals missing from the result could not be resolved, a page failed
+        last_activity_times = {}
+        remaining = set(service_account_emails)
+
+        search_windows = get_search_windows(
+            self.log_search_strategy, start_time, time_now
         )
-        start_time_str, end_time_str = (
-            start_time.isoformat().split(".")[0] + "Z",
-            end_time.isoformat().split(".")[0] + "Z",
+        for window_start, window_end in search_windows:
+            principals = tuple(sorted(remaining))
+            page_token = None
+            while remaining:
+                response = self._list_entries_principals(
+                    project_id, principals, window_start, window_end, page_token
+                )
+                if response is None:
+                    return last_activity_times
+
+                entries = response.get("entries", [])
+                found = False
+                for entry in entries:
+                    email = (
+                        entry.get("protoPayload", {})
+                        .get("authenticationInfo", {})
+                        .get("principalEmail")
+                    )
+                    if email in remaining:
+                        remaining.remove(email)
+                        last_activity_times[email] = entry.get("timestamp")
+                        found = True
+
+                page_token = response.get("nextPageToken")
+                if not page_token:
+                    break
+                if found:
+                    principals = tuple(sorted(remaining))
+                    window_end = entries[-1].get("timestamp")
+                    page_token = None
+                # Otherwise the next page, even after an empty one
+
+            if not remaining:
+                break
+
+        for email in remaining:
+            last_activity_times[email] = None
+        return last_activity_times
+
+    @api_retry_handler(default_response=None)
+    def _list_entries_principals(
+        self,
+        project_id: str,
+        service_account_emails: tuple,
+        start_time: str,
+        end_time: str,
+        page_token: str = None,
+    ):
+        principals = " OR ".join(f'"{email}"' for email in service_account_emails)
+        filter_str = (
+            f"protoPayload.authenticationInfo.principalEmail=({principals})"
+            f' AND timestamp >= "{start_time}"'
+            f' AND timestamp <= "{end_time}"'
         )
-        timestamp_filter = (
-            f' AND timestamp >= "{start_time_str}"'
-            f' AND timestamp <= "{end_time_str}"'
+
+        body = {
+            "resourceNames": [f"projects/{project_id}"],
+            "orderBy": "timestamp desc",
+            "pageSize": LOG_BULK_PAGE_SIZE,
+            "filter": filter_str,
+        }
+        if page_token:
+            body["pageToken"] = page_token
+        return (
+            self.client.entries()
+            .list(
+                body=body,
+                fields="entries(timestamp,protoPayload/authenticationInfo/principalEmail),"
+                "nextPageToken",
+            )
+            .execute()
         )
-        return timestamp_filter
+
+
+def get_service_account_filter_str(
+    service_account_email: str, service_account_key_name: str = None
+) -> str:
+    filter_str = (
+        f'protoPayload.authenticationInfo.principalEmail="{service_account_email}"'
+    )
+    if service_account_key_name:
+        resource_name = f"//iam.googleapis.com/{service_account_key_name}"
+        filter_str += f' AND protoPayload.authenticationInfo.serviceAccountKeyName="{resource_name}"'
+    return filter_str
+
+
+def get_search_windows(
+    log_search_strategy: str, start_time: datetime, time_now: datetime
+) -> list:
+    # Probing searches the last day first, then older and older windows,
+    # so recently active accounts are answered by narrow queries
+    if log_search_strategy != "probing":
+        return [(format_timestamp(start_time), format_timestamp(time_now))]
+
+    windows = []
+    end_time = time_now
+    for days in LOG_PROBE_WINDOW_DAYS + [None]:
+        window_start = start_time
+        if days is not None:
+            window_start = max(time_now - timedelta(days=days), start_time)
+        if window_start < end_time:
+            windows.append((format_timestamp(window_start), format_timestamp(end_time)))
+            end_time = window_start
+        if window_start == start_time:
+            break
+
+    return windows
+
+
+def get_search_start_time(log_search_period: str, time_now: datetime) -> datetime:
+    if log_search_period == "1 Month":
+        log_search_period_in_days = 31
+    elif log_search_period == "3 Months":
+        log_search_period_in_days = 92
+    elif log_search_period == "6 Months":
+        log_search_period_in_days = 183
+    else:
+        log_search_period_in_days = 365
+
+    return time_now - timedelta(days=log_search_period_in_days)
+
+
+def format_timestamp(time: datetime) -> str:
+    return time.isoformat().split(".")[0] + "Z"
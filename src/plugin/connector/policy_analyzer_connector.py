@@ -0,0 +1,40 @@
+import logging
+from plugin.connector import GoogleCloudConnector
+from plugin.utils.error_handlers import api_retry_handler
+from plugin.utils.request_cache import collect_cache
+
+__all__ = ["PolicyAnalyzerConnector"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class PolicyAnalyzerConnector(GoogleCloudConnector):
+    google_client_service = "policyanalyzer"
+    version = "v1"
+
+    @collect_cache
+    @api_retry_handler(default_response=None)
+    def query_activities(self, project_id: str, activity_type: str):
+        # e.g. serviceAccountLastAuthentication, serviceAccountKeyLastAuthentication
+        parent = f"projects/{project_id}/locations/global/activityTypes/{activity_type}"
+        activities = []
+        request = (
+            self.client.projects()
+            .locations()
+            .activityTypes()
+            .activities()
+            .query(parent=parent, pageSize=1000)
+        )
+
+        while request is not None:
+            response = request.execute()
+            activities.extend(response.get("activities", []))
+            request = (
+                self.client.projects()
+                .locations()
+                .activityTypes()
+                .activities()
+                .query_next(previous_request=request, previous_response=response)
+            )
+
+        return activities
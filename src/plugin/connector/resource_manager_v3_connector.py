@@ -1,6 +1,7 @@
 import logging
 
 from plugin.connector import GoogleCloudConnector
+from plugin.utils.request_cache import collect_cache
 
 __all__ = ["ResourceManagerV3Connector"]
 
@@ -11,25 +12,41 @@ class ResourceManagerV3Connector(GoogleCloudConnector):
     google_client_service = "cloudresourcemanager"
     version = "v3"
 
+    @collect_cache
     def get_project(self, project_id: str = None):
         project_id = project_id or self.project_id
         result = self.client.projects().get(name=f"projects/{project_id}").execute()
         return result
 
+    @collect_cache
     def get_folder(self, folder_id):
         return self.client.folders().get(name=folder_id).execute()
 
+    @collect_cache
     def get_organization(self, organization_id):
         return self.client.organizations().get(name=organization_id).execute()
 
+    @collect_cache
     def search_organizations(self):
-        results = self.client.organizations().search().execute()
-        return results.get("organizations", [])
+        return list(
+            self.paginate(
+                self.client.organizations().search(),
+                self.client.organizations().search_next,
+                "organizations",
+            )
+        )
 
+    @collect_cache
     def search_folders(self):
-        results = self.client.folders().search().execute()
-        return results.get("folders", [])
+        return list(
+            self.paginate(
+                self.client.folders().search(),
+                self.client.folders().search_next,
+                "folders",
+            )
+        )
 
+    @collect_cache
     def list_all_projects(self):
         projects = []
         organizations = self.search_organizations()
@@ -43,14 +60,27 @@ class ResourceManagerV3Connector(GoogleCloudConnector):
             projects.extend(self.list_projects(folder_id))
         return projects
 
-    def list_projects(self, parent):
-        result = self.client.projects().list(parent=parent).execute()
-        return result.get("projects", [])
+    @collect_cache
+    def list_projects(self, parent, show_deleted: bool = False):
+        return list(
+            self.paginate(
+                self.client.projects().list(parent=parent, showDeleted=show_deleted),
+                self.client.projects().list_next,
+                "projects",
+            )
+        )
 
+    @collect_cache
     def list_folders(self, parent):
-        results = self.client.folders().list(parent=parent).execute()
-        return results.get("folders", [])
+        return list(
+            self.paginate(
+                self.client.folders().list(parent=parent),
+                self.client.folders().list_next,
+                "folders",
+            )
+        )
 
+    @collect_cache
     def get_project_iam_policies(self, project_id: str = None):
         project_id = project_id or self.project_id
         resource = f"projects/{project_id}"
@@ -60,6 +90,7 @@ class ResourceManagerV3Connector(GoogleCloudConnector):
         )
         return result.get("bindings", [])
 
+    @collect_cache
     def get_folder_iam_policies(self, resource):
         body = {"options": {"requestedPolicyVersion": 3}}
         result = (
@@ -67,6 +98,7 @@ class ResourceManagerV3Connector(GoogleCloudConnector):
         )
         return result.get("bindings", [])
 
+    @collect_cache
     def get_organization_iam_policies(self, resource):
         body = {"options": {"requestedPolicyVersion": 3}}
         result = (
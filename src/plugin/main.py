@@ -1,12 +1,19 @@
 import logging
 import os
+import threading
 import time
 from typing import Generator
 
 from spaceone.core.error import ERROR_REQUIRED_PARAMETER
+from spaceone.inventory.plugin.collector.lib import make_error_response
 from spaceone.inventory.plugin.collector.lib.server import CollectorPluginServer
 
+from .conf.global_conf import MANAGER_QUEUE_SIZE, PREWARM_ENABLED, RETRY_BUDGET
 from .manager.base import ResourceManager
+from .utils.circuit_breaker import circuit_breaker_scope
+from .utils.concurrency import get_concurrency_windows, merge_generators
+from .utils.error_handlers import retry_budget_scope
+from .utils.request_cache import request_cache_scope
 
 app = CollectorPluginServer()
 
@@ -15,6 +22,8 @@ _LOGGER = logging.getLogger("spaceone")
 
 @app.route("Collector.init")
 def collector_init(params: dict) -> dict:
+    if PREWARM_ENABLED:
+        _start_prewarm()
     return _create_init_metadata()
 
 
@@ -37,13 +46,47 @@ def collector_collect(params: dict) -> Generator[dict, None, None]:
     _LOGGER.debug(
         f"[collector_collect] Start Collecting Cloud Resources (project_id: {project_id})"
     )
-    resource_mgrs = ResourceManager.list_managers()
-    for resource_mgr in resource_mgrs:
-        yield from resource_mgr().collect_resources(options, secret_data, schema)
+    # Imported here, the client pool loads the HTTP client libraries
+    from .connector.client_pool import client_lease_scope
+
+    with client_lease_scope():
+        with request_cache_scope() as request_cache, retry_budget_scope(
+            options.get("retry_budget", RETRY_BUDGET)
+        ) as retry_budget, circuit_breaker_scope() as circuit_breakers:
+            resource_mgrs = ResourceManager.list_managers()
+            if options.get("concurrent_managers"):
+                yield from merge_generators(
+                    [
+                        resource_mgr().collect_resources(options, secret_data, schema)
+                        for resource_mgr in resource_mgrs
+                    ],
+                    MANAGER_QUEUE_SIZE,
+                )
+            else:
+                for resource_mgr in resource_mgrs:
+                    yield from resource_mgr().collect_resources(
+                        options, secret_data, schema
+                    )
+
+            # One error per API, project and affected cloud service type instead of one
+            # per skipped call
+            for circuit_breaker in circuit_breakers.list_open_breakers():
+                for cloud_service_group, cloud_service_type in sorted(
+                    circuit_breaker.cloud_service_types
+                ):
+                    yield make_error_response(
+                        error=circuit_breaker.to_error(),
+                        provider="google_cloud",
+                        cloud_service_group=cloud_service_group,
+                        cloud_service_type=cloud_service_type,
+                    )
 
     _LOGGER.debug(
         f"[collector_collect] Finished Collecting Cloud Resources "
-        f"(project_id: {project_id}, duration: {time.time() - start_time:.2f}s)"
+        f"(project_id: {project_id}, duration: {time.time() - start_time:.2f}s, "
+        f"request cache hits: {request_cache.hits}, misses: {request_cache.misses}, "
+        f"retries: {retry_budget.used}/{retry_budget.limit}, "
+        f"concurrency windows: {get_concurrency_windows()})"
     )
 
 
@@ -68,7 +111,93 @@ def _create_init_metadata() -> dict:
                         "enum": ["1 Month", "3 Months", "6 Months", "1 Year"],
                         "description": "Select the period to search for the last activity log for the service accounts.\
  The longer the period, the longer it will take to collect data.",
-                    }
+                    },
+                    "hierarchy_cache_ttl": {
+                        "title": "Organization Hierarchy Cache TTL (seconds)",
+                        "type": "integer",
+                        "default": 0,
+                        "description": "How long the organization, folder and project hierarchy is reused\
+ across collections. Projects created within this time are not collected until it expires.\
+ 0 (default) crawls the hierarchy on every collection.",
+                    },
+                    "role_catalog_ttl": {
+                        "title": "Predefined Role Catalog TTL (seconds)",
+                        "type": "integer",
+                        "default": 86400,
+                        "description": "How long the predefined role catalog cached on the worker is used before\
+ it is revalidated against the role etags. Set to 0 to revalidate it on every collection.",
+                    },
+                    "activity_backend": {
+                        "title": "Last Activity Backend",
+                        "type": "string",
+                        "default": "logging",
+                        "enum": ["logging", "policy_analyzer"],
+                        "description": "Where the last activity of service accounts is looked up.\
+ policy_analyzer reads the last authentication of all service accounts and keys of a project in bulk\
+ and falls back to Cloud Logging when the Policy Analyzer API is unavailable.",
+                    },
+                    "log_search_strategy": {
+                        "title": "Log Search Strategy",
+                        "type": "string",
+                        "default": "single",
+                        "enum": ["single", "probing"],
+                        "description": "single searches the whole log search period in one query.\
+ probing searches the last day, week, month and so on until activity is found,\
+ which is faster for recently active service accounts.",
+                    },
+                    "activity_cache_ttl": {
+                        "title": "Last Activity Cache TTL (seconds)",
+                        "type": "integer",
+                        "default": 604800,
+                        "description": "Service accounts checked within this time only search the logs written since\
+ the last check. Set to 0 to search the whole log search period on every collection.",
+                    },
+                    "max_concurrency": {
+                        "title": "Max Concurrency",
+                        "type": "integer",
+                        "default": 8,
+                        "description": "Maximum number of concurrent Google Cloud API calls,\
+ e.g. when crawling the hierarchy or looking up service account activity and keys.",
+                    },
+                    "retry_budget": {
+                        "title": "Retry Budget",
+                        "type": "integer",
+                        "default": 500,
+                        "description": "Maximum number of retries of failed Google Cloud API calls in one collection.\
+ Rate limited (429) and server errors (5xx) are retried with exponential backoff.",
+                    },
+                    "api_rate_limits": {
+                        "title": "API Rate Limits (requests per minute)",
+                        "type": "object",
+                        "description": 'Requests per minute allowed per API for the project of the service account,\
+ e.g. {"logging": 60, "iam": 6000}. Align these with the quotas of the project.',
+                    },
+                    "concurrent_managers": {
+                        "title": "Collect Resource Types Concurrently",
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Collect groups, roles, permissions and service accounts at the same time.",
+                    },
+                    "use_http2": {
+                        "title": "Use HTTP/2",
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Look up service account activity and keys with an async HTTP/2 client.",
+                    },
+                    "use_asset_inventory": {
+                        "title": "Use Cloud Asset Inventory",
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Read organization-wide data from the Cloud Asset API in bulk.\
+ Falls back to per-resource API calls when the Cloud Asset API is unavailable.",
+                    },
+                    "project_filter": {
+                        "title": "Project Filter",
+                        "type": "object",
+                        "description": "Projects to collect. Supports include_project_ids and exclude_project_ids\
+ (regular expressions), labels (key/value pairs that must all match) and lifecycle_states.\
+ They are added to the defaults: ACTIVE projects, excluding those whose ID starts with 'sys-'.",
+                    },
                 },
             },
         }
@@ -102,3 +231,49 @@ def _check_secret_data(secret_data: dict) -> None:
 
     if "project_id" not in secret_data:
         raise ERROR_REQUIRED_PARAMETER(key="secret_data.project_id")
+
+
+def _prewarm() -> None:
+    # Does the loading of the first collect while the server is still idle
+    start_time = time.time()
+    try:
+        from .connector import GoogleCloudConnector
+        from .connector.discovery_documents import get_discovery_document
+        from .utils.role_catalog import RoleCatalog
+
+        for resource_mgr in ResourceManager.list_managers():
+            manager = resource_mgr()
+            manager.get_cloud_service_type()
+            for _ in manager.collect_metrics():
+                pass
+
+        connectors = GoogleCloudConnector.__subclasses__()
+        while connectors:
+            connector = connectors.pop()
+            connectors.extend(connector.__subclasses__())
+            if connector.google_client_service:
+                get_discovery_document(
+                    connector.google_client_service, connector.version
+                )
+
+        RoleCatalog.get_catalog().count()
+    except Exception as e:
+        _LOGGER.warning(f"[_prewarm] Failed to pre-warm the plugin: {e}")
+        return
+
+    _LOGGER.debug(f"[_prewarm] Finished ({time.time() - start_time:.2f}s)")
+
+
+_prewarm_lock = threading.Lock()
+_prewarm_thread = None
+
+
+def _start_prewarm() -> None:
+    # Once per process, on the first Collector.init rather than at import
+    global _prewarm_thread
+    with _prewarm_lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(
+                target=_prewarm, name="prewarm", daemon=True
+            )
+            _prewarm_thread.start()
@@ -1 +1,10 @@
-from .iam import *
+import importlib
+
+__all__ = ["ServiceAccountManager", "RoleManager", "PermissionManager", "GroupManager"]
+
+
+def __getattr__(name: str):
+    # Managers pull in the Google API client libraries, so they load on first use
+    if name in __all__:
+        return getattr(importlib.import_module(".iam", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
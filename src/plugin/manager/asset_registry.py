@@ -0,0 +1,100 @@
+import copy
+import logging
+import os
+import threading
+from typing import Callable
+
+from spaceone.core import utils
+from spaceone.inventory.plugin.collector.lib import make_response
+
+from plugin.conf.global_conf import REGION_INFO
+
+__all__ = ["AssetRegistry"]
+
+_LOGGER = logging.getLogger("spaceone")
+CURRENT_DIR = os.path.dirname(__file__)
+METRIC_DIR = os.path.join(CURRENT_DIR, "../metrics/")
+
+
+class AssetRegistry:
+    _registry = None
+    _registry_lock = threading.Lock()
+
+    def __init__(self, metric_dir: str = METRIC_DIR):
+        # Responses are built once; every caller gets its own copy, so a collect
+        # that changes one can not leak it into the collects of other tenants
+        self.metrics = self._load_metrics(metric_dir)
+        self.regions = self._make_regions(REGION_INFO)
+        self.cloud_service_types = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_registry(cls) -> "AssetRegistry":
+        with cls._registry_lock:
+            if cls._registry is None:
+                cls._registry = cls()
+            return cls._registry
+
+    def list_metrics(self, cloud_service_group: str, cloud_service_type: str) -> list:
+        return copy.deepcopy(
+            self.metrics.get((cloud_service_group, cloud_service_type), [])
+        )
+
+    def get_region(self, region_code: str = None):
+        if region_code is None:
+            return copy.deepcopy(next(iter(self.regions.values()), None))
+        return copy.deepcopy(self.regions.get(region_code))
+
+    def get_cloud_service_type(self, key: tuple, make_cloud_service_type: Callable):
+        with self._lock:
+            if key not in self.cloud_service_types:
+                self.cloud_service_types[key] = make_cloud_service_type()
+            cloud_service_type = self.cloud_service_types[key]
+        return copy.deepcopy(cloud_service_type)
+
+    @staticmethod
+    def _load_metrics(metric_dir: str) -> dict:
+        # metrics/{cloud_service_group}/{cloud_service_type}/*.yaml, namespaces first
+        metrics = {}
+        for group in sorted(os.listdir(metric_dir)):
+            group_dir = os.path.join(metric_dir, group)
+            for cloud_service_type in sorted(os.listdir(group_dir)):
+                type_dir = os.path.join(group_dir, cloud_service_type)
+                filenames = [
+                    filename
+                    for filename in sorted(os.listdir(type_dir))
+                    if filename.endswith(".yaml")
+                ]
+                filenames.sort(key=lambda filename: filename != "namespace.yaml")
+                responses = metrics[(group, cloud_service_type)] = []
+                for filename in filenames:
+                    info = utils.load_yaml_from_file(os.path.join(type_dir, filename))
+                    if filename == "namespace.yaml":
+                        responses.append(
+                            make_response(
+                                namespace=info,
+                                match_keys=[],
+                                resource_type="inventory.Namespace",
+                            )
+                        )
+                    else:
+                        responses.append(
+                            make_response(
+                                metric=info,
+                                match_keys=[],
+                                resource_type="inventory.Metric",
+                            )
+                        )
+
+        return metrics
+
+    @staticmethod
+    def _make_regions(region_info: dict) -> dict:
+        return {
+            region_code: make_response(
+                region={**info, "region_code": region_code},
+                match_keys=[["provider", "region_code"]],
+                resource_type="inventory.Region",
+            )
+            for region_code, info in region_info.items()
+        }
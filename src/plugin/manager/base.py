@@ -1,19 +1,18 @@
-import copy
-import os
+import importlib
 import abc
 import logging
 from typing import List, Type, Generator
 
 from spaceone.core.manager import BaseManager
-from spaceone.core import utils
 from spaceone.core.error import ERROR_NOT_IMPLEMENTED
 from spaceone.inventory.plugin.collector.lib import *
 
-from plugin.conf.global_conf import REGION_INFO, ICON_URL_PREFIX
+from plugin.conf.global_conf import ICON_URL_PREFIX
+from plugin.manager.asset_registry import AssetRegistry
+from plugin.utils.circuit_breaker import iter_in_cloud_service_type_scope
 
 _LOGGER = logging.getLogger("spaceone")
-CURRENT_DIR = os.path.dirname(__file__)
-METRIC_DIR = os.path.join(CURRENT_DIR, "../metrics/")
+MANAGER_MODULES = ["plugin.manager.iam"]
 
 __all__ = ["ResourceManager"]
 
@@ -56,10 +55,22 @@ class ResourceManager(BaseManager):
                 f"[{self.__repr__()}] Collect cloud services: "
                 f"{self.cloud_service_group} > {self.cloud_service_type}"
             )
-            response_iterator = self.collect_cloud_services(
-                options, secret_data, schema
+            response_iterator = iter_in_cloud_service_type_scope(
+                self.collect_cloud_services(options, secret_data, schema),
+                self.cloud_service_group,
+                self.cloud_service_type,
             )
             for response in response_iterator:
+                if isinstance(response, Exception):
+                    # A listing that failed for one scope; the other scopes go on
+                    _LOGGER.error(f"[{self.__repr__()}] Error: {str(response)}")
+                    yield make_error_response(
+                        error=response,
+                        provider=self.provider,
+                        cloud_service_group=self.cloud_service_group,
+                        cloud_service_type=self.cloud_service_type,
+                    )
+                    continue
                 try:
                     yield make_response(
                         resource_type="inventory.CloudService",
@@ -98,6 +109,13 @@ class ResourceManager(BaseManager):
         raise ERROR_NOT_IMPLEMENTED()
 
     def get_cloud_service_type(self) -> dict:
+        # The metadata YAML is converted once per process, not on every collect
+        return AssetRegistry.get_registry().get_cloud_service_type(
+            (self.provider, self.cloud_service_group, self.cloud_service_type),
+            self.make_cloud_service_type_response,
+        )
+
+    def make_cloud_service_type_response(self) -> dict:
         cloud_service_type = make_cloud_service_type(
             name=self.cloud_service_type,
             group=self.cloud_service_group,
@@ -118,44 +136,26 @@ class ResourceManager(BaseManager):
 
     @classmethod
     def collect_regions(cls, region: str = None) -> dict:
-        for region_code, region_info in copy.deepcopy(REGION_INFO).items():
-            if region is not None and region_code != region:
-                continue
-
-            region_info["region_code"] = region_code
-            return make_response(
-                region=region_info,
-                match_keys=[["provider", "region_code"]],
-                resource_type="inventory.Region",
-            )
+        return AssetRegistry.get_registry().get_region(region)
 
-    def collect_metrics(self) -> dict:
-        for dirname in os.listdir(os.path.join(METRIC_DIR, self.cloud_service_group)):
-            for filename in os.listdir(
-                os.path.join(METRIC_DIR, self.cloud_service_group, dirname)
-            ):
-                if filename.endswith(".yaml"):
-                    file_path = os.path.join(
-                        METRIC_DIR, self.cloud_service_group, dirname, filename
-                    )
-                    info = utils.load_yaml_from_file(file_path)
-                    if filename == "namespace.yaml":
-                        yield make_response(
-                            namespace=info,
-                            match_keys=[],
-                            resource_type="inventory.Namespace",
-                        )
-                    else:
-                        yield make_response(
-                            metric=info,
-                            match_keys=[],
-                            resource_type="inventory.Metric",
-                        )
+    def collect_metrics(self) -> Generator[dict, None, None]:
+        # Only this manager's metrics/{group}/{type} directory, so every namespace and
+        # metric is emitted once per collect
+        yield from AssetRegistry.get_registry().list_metrics(
+            self.cloud_service_group, self.cloud_service_type
+        )
 
     @classmethod
     def list_managers(cls) -> List[Type["ResourceManager"]]:
+        cls.load_managers()
         return cls.__subclasses__()
 
+    @staticmethod
+    def load_managers() -> None:
+        # Imported on first use rather than with the plugin server
+        for module_name in MANAGER_MODULES:
+            importlib.import_module(module_name)
+
     @classmethod
     def get_manager_by_service(cls, service: str) -> Type["ResourceManager"]:
         for manager in cls.list_managers():
@@ -167,6 +167,6 @@ class ResourceManager(BaseManager):
     @classmethod
     def get_service_names(cls) -> List[str]:
         services_name = set()
-        for sub_cls in cls.__subclasses__():
+        for sub_cls in cls.list_managers():
             services_name.add(sub_cls.service)
         return list(services_name)
@@ -1,9 +1,11 @@
 import logging
 from typing import Generator
 from spaceone.inventory.plugin.collector.lib import *
+from plugin.connector import ERROR_GOOGLE_API_LISTING_INCOMPLETE
 from plugin.connector.cloud_identity_connector import CloudIdentityConnector
 from plugin.connector.resource_manager_v3_connector import ResourceManagerV3Connector
 from plugin.manager.base import ResourceManager
+from plugin.utils.hierarchy_index import HierarchyIndex
 
 _LOGGER = logging.getLogger("spaceone")
 
@@ -30,16 +32,26 @@ class GroupManager(ResourceManager):
         self.identity_connector = CloudIdentityConnector(options, secret_data, schema)
         self.rm_v3_connector = ResourceManagerV3Connector(options, secret_data, schema)
 
-        for organization in self.rm_v3_connector.search_organizations():
+        hierarchy_index = HierarchyIndex.load_or_build(self.rm_v3_connector, options)
+        for organization in hierarchy_index.list_organizations():
             yield from self.collect_groups(organization)
 
     def collect_groups(self, organization: dict) -> Generator[dict, None, None]:
         customer_id = organization.get("directoryCustomerId")
         organization_id = organization.get("name")
         organization_name = organization.get("displayName")
-        groups = self.identity_connector.list_groups(customer_id)
+        try:
+            groups = self.identity_connector.list_groups(customer_id)
+        except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+            yield e
+            return
+
         for group in groups:
-            yield self.make_group_info(group, organization_id, organization_name)
+            try:
+                yield self.make_group_info(group, organization_id, organization_name)
+            except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+                # Left out rather than reported with some of its members
+                yield e
 
     def make_group_info(
         self, group: dict, organization_id: str, organization_name: str
@@ -69,8 +81,7 @@ class GroupManager(ResourceManager):
 
     def get_group_members(self, group_id: str) -> list:
         changed_members = []
-        members = self.identity_connector.list_memberships(group_id)
-        for member_info in members:
+        for member_info in self.identity_connector.list_memberships(group_id):
             if member_info.get("memberType"):
                 member_info["memberType"] = member_info.pop("type")
             roles = member_info.get("roles", [])
@@ -1,12 +1,23 @@
 import logging
-from typing import Generator
+from typing import Callable, Generator
 from spaceone.inventory.plugin.collector.lib import *
+from plugin.connector import ERROR_GOOGLE_API_LISTING_INCOMPLETE
+from plugin.connector.asset_connector import AssetConnector
 from plugin.connector.iam_connector import IAMConnector
 from plugin.connector.resource_manager_v3_connector import ResourceManagerV3Connector
 from plugin.manager.base import ResourceManager
+from plugin.utils.concurrency import get_max_concurrency, ordered_map
+from plugin.utils.hierarchy_index import HierarchyIndex
+from plugin.utils.role_catalog import RoleCatalog
 
 _LOGGER = logging.getLogger("spaceone")
 
+IAM_POLICY_ASSET_TYPES = [
+    "cloudresourcemanager.googleapis.com/Organization",
+    "cloudresourcemanager.googleapis.com/Folder",
+    "cloudresourcemanager.googleapis.com/Project",
+]
+
 
 class PermissionManager(ResourceManager):
     service = "IAM"
@@ -23,8 +34,15 @@ class PermissionManager(ResourceManager):
         self.metadata_path = "metadata/permission.yaml"
         self.iam_connector = None
         self.rm_v3_connector = None
+        self.asset_connector = None
+        self.hierarchy_index = None
+        self.role_catalog = None
+        self.options = {}
+        self.max_concurrency = 1
         self.permission_info = {}
         self.service_account_info = {}
+        # Listings that failed; reported after the permissions built without them
+        self.listing_errors = []
         self.location_info = {
             "FOLDER": {},
             "PROJECT": {},
@@ -38,45 +56,172 @@ class PermissionManager(ResourceManager):
     def collect_cloud_services(
         self, options: dict, secret_data: dict, schema: str
     ) -> Generator[dict, None, None]:
+        self.options = options
+        self.max_concurrency = get_max_concurrency(options)
         self.iam_connector = IAMConnector(options, secret_data, schema)
         self.rm_v3_connector = ResourceManagerV3Connector(options, secret_data, schema)
 
-        organizations = self.rm_v3_connector.search_organizations()
-        folders = self.rm_v3_connector.search_folders()
-        projects = self.rm_v3_connector.list_all_projects()
-
-        predefined_roles = self.iam_connector.list_roles()
-        organization_roles = []
+        self.hierarchy_index = HierarchyIndex.load_or_build(
+            self.rm_v3_connector, options
+        )
+        organizations = self.hierarchy_index.list_organizations()
+        folders = self.hierarchy_index.list_folders()
+        projects = self.hierarchy_index.list_projects()
+
+        # Only compact summaries of the roles are kept, not their permissions.
+        # Predefined roles are looked up in the role catalog as bindings need them
+        self.role_catalog = RoleCatalog.load(self.iam_connector, options)
+        if self.role_catalog is None:
+            self.add_role_summaries("predefined_roles", self.iam_connector.iter_roles)
         for organization in organizations:
-            organization_roles.extend(self.iam_connector.list_organization_roles(
-                organization["name"]
-            ))
-        project_roles = []
-        for project in projects:
-            project_roles.extend(self.iam_connector.list_project_roles(
-                project["projectId"]
-            ))
-
-        self.role_id_to_info["predefined_roles"] = {role.get("name"): role for role in predefined_roles}
-        self.role_id_to_info["organization_roles"] = {role.get("name"): role for role in organization_roles}
-        self.role_id_to_info["project_roles"] = {role.get("name"): role for role in project_roles}
-
-        # Get service account info
-        self.get_service_account_info()
+            self.add_role_summaries(
+                "organization_roles",
+                self.iam_connector.list_organization_roles,
+                organization["name"],
+            )
+
+        # Get custom roles and service accounts of all projects concurrently
+        project_resources = ordered_map(
+            self.get_project_resources, projects, self.max_concurrency
+        )
+        for project, (roles, service_accounts) in zip(projects, project_resources):
+            self.role_id_to_info["project_roles"].update(roles)
+            self.add_service_account_info(project["projectId"], service_accounts)
+
+        if options.get("use_asset_inventory") and organizations:
+            try:
+                self.asset_connector = AssetConnector(options, secret_data, schema)
+                self.collect_asset_inventory_permissions(organizations)
+            except Exception as e:
+                _LOGGER.warning(
+                    f"[{self.__repr__()}] Failed to search the IAM policies of "
+                    f"{len(organizations)} organizations in Cloud Asset Inventory, "
+                    f"reading the policy of every organization, folder and project "
+                    f"instead: {e}"
+                )
+                self.permission_info = {}
+                self.collect_resource_permissions(organizations, folders, projects)
+        else:
+            self.collect_resource_permissions(organizations, folders, projects)
+
+        yield from self.make_permission_info()
+        yield from self.listing_errors
 
+    def collect_resource_permissions(
+        self, organizations: list, folders: list, projects: list
+    ) -> None:
         # Get organization permissions
-        for organization in organizations:
-            self.collect_organization_permissions(organization)
+        self.collect_permissions(
+            organizations,
+            self.make_organization_target,
+            self.rm_v3_connector.get_organization_iam_policies,
+        )
 
         # Get folder permissions
-        for folder in folders:
-            self.collect_folder_permissions(folder)
+        self.collect_permissions(
+            folders,
+            self.make_folder_target,
+            self.rm_v3_connector.get_folder_iam_policies,
+        )
 
         # Get all projects
-        for project in projects:
-            self.collect_project_permissions(project)
+        self.collect_permissions(
+            projects,
+            self.make_project_target,
+            self.rm_v3_connector.get_project_iam_policies,
+        )
+
+    def collect_permissions(
+        self, resources: list, make_target, get_iam_policies
+    ) -> None:
+        targets = [make_target(resource) for resource in resources]
+
+        # Policies are fetched concurrently but merged in order on this thread
+        bindings_by_target = ordered_map(
+            lambda target: get_iam_policies(target["id"]),
+            targets,
+            self.max_concurrency,
+        )
+        bindings_by_target = list(zip(targets, bindings_by_target))
+        self.prefetch_predefined_roles(
+            [binding for _, bindings in bindings_by_target for binding in bindings]
+        )
+        for target, bindings in bindings_by_target:
+            for binding in bindings:
+                self.parse_binding_info(binding, target)
+
+    def collect_asset_inventory_permissions(self, organizations: list) -> None:
+        for organization in organizations:
+            results = self.asset_connector.search_all_iam_policies(
+                organization["name"], asset_types=IAM_POLICY_ASSET_TYPES
+            )
+            bindings_by_target = []
+            for result in results:
+                target = self.get_asset_target(result.get("resource", ""))
+                if target is not None:
+                    bindings_by_target.append(
+                        (target, result.get("policy", {}).get("bindings", []))
+                    )
+
+            self.prefetch_predefined_roles(
+                [binding for _, bindings in bindings_by_target for binding in bindings]
+            )
+            for target, bindings in bindings_by_target:
+                for binding in bindings:
+                    self.parse_binding_info(binding, target)
+
+    def prefetch_predefined_roles(self, bindings: list) -> None:
+        # Look up predefined roles missing from the catalog in batches up front
+        predefined_roles = self.role_id_to_info["predefined_roles"]
+        role_ids = sorted(
+            {
+                binding.get("role")
+                for binding in bindings
+                if not binding.get("role", "").startswith(
+                    ("organizations/", "projects/")
+                )
+            }
+            - set(predefined_roles)
+        )
+        if self.role_catalog is not None:
+            missing_role_ids = []
+            for role_id in role_ids:
+                role = self.role_catalog.get_role(role_id)
+                if role is None:
+                    missing_role_ids.append(role_id)
+                else:
+                    predefined_roles[role_id] = self.make_role_summary(role)
+            role_ids = missing_role_ids
+
+        if role_ids:
+            roles = self.iam_connector.get_roles_batch(role_ids)
+            for role_id, role in roles.items():
+                # A role that can not be read is reported by its ID only
+                predefined_roles[role_id] = self.make_role_summary(
+                    role or {"name": role_id}
+                )
+
+    def get_asset_target(self, asset_name: str):
+        # e.g. //cloudresourcemanager.googleapis.com/projects/123456789
+        resource_name = asset_name.split("cloudresourcemanager.googleapis.com/")[-1]
+
+        if resource_name.startswith("organizations/"):
+            organization = self.hierarchy_index.organizations.get(resource_name)
+            if organization:
+                return self.make_organization_target(organization)
+        elif resource_name.startswith("folders/"):
+            folder = self.hierarchy_index.folders.get(resource_name)
+            if folder:
+                return self.make_folder_target(folder)
+        elif resource_name.startswith("projects/"):
+            project_id = self.hierarchy_index.project_names.get(
+                resource_name, resource_name.split("/")[-1]
+            )
+            project = self.hierarchy_index.projects.get(project_id)
+            if project:
+                return self.make_project_target(project)
 
-        yield from self.make_permission_info()
+        return None
 
     def make_permission_info(self) -> Generator[dict, None, None]:
         for member, permission_info in self.permission_info.items():
@@ -99,49 +244,37 @@ class PermissionManager(ResourceManager):
                 # data_format="grpc",
             )
 
-    def collect_organization_permissions(self, organization: dict) -> None:
+    @staticmethod
+    def make_organization_target(organization: dict) -> dict:
         organization_id = organization.get("name")
         organization_name = organization.get("displayName")
-        target = {
+        return {
             "targetType": "ORGANIZATION",
             "id": organization_id,
             "name": organization_name,
             "location": organization_name,
         }
-        bindings = self.rm_v3_connector.get_organization_iam_policies(organization_id)
-        for binding in bindings:
-            self.parse_binding_info(binding, target)
 
-    def collect_folder_permissions(self, folder: dict) -> None:
+    def make_folder_target(self, folder: dict) -> dict:
         folder_id = folder.get("name")
         folder_name = folder.get("displayName")
-
-        target = {
+        return {
             "targetType": "FOLDER",
             "id": folder_id,
             "name": folder_name,
             "location": self.get_folder_location(folder_id),
         }
 
-        bindings = self.rm_v3_connector.get_folder_iam_policies(folder_id)
-        for binding in bindings:
-            self.parse_binding_info(binding, target)
-
-    def collect_project_permissions(self, project: dict) -> None:
+    def make_project_target(self, project: dict) -> dict:
         project_id = project.get("projectId")
         project_name = project.get("name")
-
-        target = {
+        return {
             "targetType": "PROJECT",
             "id": project_id,
             "name": project_name,
             "location": self.get_project_location(project_id),
         }
 
-        bindings = self.rm_v3_connector.get_project_iam_policies(project_id)
-        for binding in bindings:
-            self.parse_binding_info(binding, target)
-
     def parse_binding_info(self, binding: dict, target: dict) -> None:
         binding_info = {
             "target": target,
@@ -161,7 +294,9 @@ class PermissionManager(ResourceManager):
             role_details = self.role_id_to_info["predefined_roles"].get(role_id)
             role_type = "PREDEFINED"
             if not role_details:
-                role_details = self.iam_connector.get_role(role_id)
+                role_details = self.make_role_summary(
+                    self.iam_connector.get_role(role_id)
+                )
                 self.role_id_to_info["predefined_roles"][role_id] = role_details
 
         binding_info["role"] = {
@@ -169,7 +304,7 @@ class PermissionManager(ResourceManager):
             "name": role_details.get("title"),
             "roleType": role_type,
             "description": role_details.get("description"),
-            "permissionCount": len(role_details.get("includedPermissions", [])),
+            "permissionCount": role_details.get("permissionCount", 0),
         }
 
         binding_info["condition"] = binding.get("condition", {})
@@ -212,22 +347,62 @@ class PermissionManager(ResourceManager):
                 if target_name not in self.permission_info[member]["inheritance"]:
                     self.permission_info[member]["inheritance"].append(target_name)
 
-    def get_service_account_info(self):
-        # Get all projects
-        projects = self.rm_v3_connector.list_all_projects()
-        for project in projects:
-            project_id = project["projectId"]
-            service_accounts = self.iam_connector.list_service_accounts(project_id)
-            for service_account in service_accounts:
-                self.service_account_info[service_account["email"]] = {
-                    "projectId": project_id,
-                    "name": service_account.get("displayName"),
-                }
+    def get_project_resources(self, project: dict) -> tuple:
+        project_id = project["projectId"]
+        roles = {}
+        for role in self.list_or_report(
+            self.iam_connector.list_project_roles, project_id
+        ):
+            roles[role.get("name")] = self.make_role_summary(role)
+        service_accounts = self.list_or_report(
+            self.iam_connector.list_service_accounts, project_id
+        )
+        return roles, service_accounts
+
+    def add_role_summaries(self, role_kind: str, list_roles: Callable, *args) -> None:
+        # Roles are summarized as they are listed, predefined ones page by page
+        try:
+            for role in list_roles(*args):
+                self.role_id_to_info[role_kind][role.get("name")] = (
+                    self.make_role_summary(role)
+                )
+        except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+            self.listing_errors.append(e)
+
+    def list_or_report(self, list_items: Callable, *args) -> list:
+        # An incomplete listing is reported and its items are left out
+        try:
+            return list(list_items(*args))
+        except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+            self.listing_errors.append(e)
+            return []
+
+    @staticmethod
+    def make_role_summary(role: dict) -> dict:
+        return {
+            "name": role.get("name"),
+            "title": role.get("title"),
+            "description": role.get("description"),
+            "permissionCount": len(role.get("includedPermissions", [])),
+        }
+
+    def add_service_account_info(self, project_id: str, service_accounts: list):
+        for service_account in service_accounts:
+            self.service_account_info[service_account["email"]] = {
+                "projectId": project_id,
+                "name": service_account.get("displayName"),
+            }
 
     def get_folder_location(self, folder_id: str) -> str:
+        location = self.hierarchy_index.get_folder_location(folder_id)
+        if location:
+            return location
+
         if folder_id in self.location_info["FOLDER"]:
             return self.location_info["FOLDER"][folder_id]
 
+        # Index is stale or incomplete, rebuild it on the next collect
+        HierarchyIndex.invalidate(self.rm_v3_connector, self.options)
         folder = self.rm_v3_connector.get_folder(folder_id)
         parent = folder.get("parent")
         if parent.startswith("organizations/"):
@@ -243,9 +418,15 @@ class PermissionManager(ResourceManager):
         return location
 
     def get_project_location(self, project_id: str) -> str:
+        location = self.hierarchy_index.get_project_location(project_id)
+        if location:
+            return location
+
         if project_id in self.location_info["PROJECT"]:
             return self.location_info["PROJECT"][project_id]
 
+        # Index is stale or incomplete, rebuild it on the next collect
+        HierarchyIndex.invalidate(self.rm_v3_connector, self.options)
         project = self.rm_v3_connector.get_project(project_id)
         parent = project.get("parent")
         if parent.startswith("organizations/"):
@@ -1,12 +1,18 @@
 import logging
-from typing import Generator
+from typing import Generator, Iterable
 from spaceone.inventory.plugin.collector.lib import *
+from plugin.connector import ERROR_GOOGLE_API_LISTING_INCOMPLETE
+from plugin.connector.asset_connector import AssetConnector
 from plugin.connector.iam_connector import IAMConnector
 from plugin.connector.resource_manager_v3_connector import ResourceManagerV3Connector
 from plugin.manager.base import ResourceManager
+from plugin.utils.hierarchy_index import HierarchyIndex
+from plugin.utils.role_catalog import RoleCatalog
 
 _LOGGER = logging.getLogger("spaceone")
 
+ROLE_ASSET_TYPE = "iam.googleapis.com/Role"
+
 
 class RoleManager(ResourceManager):
     service = "IAM"
@@ -30,36 +36,98 @@ class RoleManager(ResourceManager):
         self.iam_connector = IAMConnector(options, secret_data, schema)
         self.rm_v3_connector = ResourceManagerV3Connector(options, secret_data, schema)
         default_project_id = secret_data.get("project_id")
+        hierarchy_index = HierarchyIndex.load_or_build(self.rm_v3_connector, options)
 
-        # Get all roles
-        predefined_roles = self.iam_connector.list_roles()
-        for role in predefined_roles:
-            yield self.make_role_info(role, default_project_id, "PREDEFINED")
+        # Get all roles from the worker's role catalog, or page by page without it
+        role_catalog = RoleCatalog.load(self.iam_connector, options)
+        if role_catalog is not None:
+            predefined_roles = role_catalog.iter_roles()
+        else:
+            predefined_roles = self.iam_connector.iter_roles()
+        try:
+            for role in predefined_roles:
+                yield self.make_role_info(role, default_project_id, "PREDEFINED")
+        except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+            yield e
+
+        organizations = hierarchy_index.list_organizations()
+        custom_roles = None
+        if options.get("use_asset_inventory") and organizations:
+            custom_roles = self.list_asset_custom_roles(
+                options, secret_data, schema, organizations
+            )
 
         # get Organization roles
-        organizations = self.rm_v3_connector.search_organizations()
         for organization in organizations:
-            yield from self.collect_organization_roles(organization, default_project_id)
+            roles = None
+            if custom_roles is not None:
+                roles = custom_roles.get(organization["name"], [])
+            yield from self.collect_organization_roles(
+                organization, default_project_id, roles
+            )
 
         # Get all projects
-        projects = self.rm_v3_connector.list_all_projects()
+        projects = hierarchy_index.list_projects()
         for project in projects:
-            yield from self.collect_project_roles(project["projectId"])
+            roles = None
+            if custom_roles is not None:
+                roles = custom_roles.get(f"projects/{project['projectId']}", [])
+            yield from self.collect_project_roles(project["projectId"], roles)
+
+    def list_asset_custom_roles(
+        self, options: dict, secret_data: dict, schema: str, organizations: list
+    ):
+        custom_roles = {}
+        try:
+            asset_connector = AssetConnector(options, secret_data, schema)
+            for organization in organizations:
+                assets = asset_connector.list_assets(
+                    organization["name"], [ROLE_ASSET_TYPE]
+                )
+                for asset in assets:
+                    role = asset.get("resource", {}).get("data", {})
+                    if role.get("deleted"):
+                        continue
+
+                    # organizations/{org_id}/roles/{role} or projects/{project_id}/roles/{role}
+                    parent = role.get("name", "").split("/roles/")[0]
+                    custom_roles.setdefault(parent, []).append(role)
+        except Exception as e:
+            _LOGGER.warning(
+                f"[{self.__repr__()}] Failed to list custom roles of "
+                f"{len(organizations)} organizations from Cloud Asset Inventory, "
+                f"listing them per organization and project instead: {e}"
+            )
+            return None
+
+        return custom_roles
 
     def collect_organization_roles(
-        self, organization: dict, default_project_id: str
+        self, organization: dict, default_project_id: str, roles: Iterable = None
     ) -> Generator[dict, None, None]:
         organization_id = organization.get("name")
         organization_name = organization.get("displayName")
         location = f"organizations/{organization_name}"
-        roles = self.iam_connector.list_organization_roles(organization_id)
+        if roles is None:
+            try:
+                roles = self.iam_connector.list_organization_roles(organization_id)
+            except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+                yield e
+                return
         for role in roles:
             yield self.make_role_info(
                 role, default_project_id, "ORGANIZATION", location
             )
 
-    def collect_project_roles(self, project_id: str) -> Generator[dict, None, None]:
-        roles = self.iam_connector.list_project_roles(project_id)
+    def collect_project_roles(
+        self, project_id: str, roles: Iterable = None
+    ) -> Generator[dict, None, None]:
+        if roles is None:
+            try:
+                roles = self.iam_connector.list_project_roles(project_id)
+            except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+                yield e
+                return
         location = f"projects/{project_id}"
         for role in roles:
             yield self.make_role_info(role, project_id, "PROJECT", location)
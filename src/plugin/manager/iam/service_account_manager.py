@@ -1,14 +1,35 @@
+import asyncio
 import logging
+from datetime import datetime
 from dateutil.parser import parse
 from typing import Generator
 from spaceone.inventory.plugin.collector.lib import *
+from plugin.conf.global_conf import ASYNC_MAX_CONCURRENT_REQUESTS
+from plugin.connector import ERROR_GOOGLE_API_LISTING_INCOMPLETE
+from plugin.connector.asset_connector import AssetConnector
+from plugin.connector.async_connector import gather_with_limit, run_async
+from plugin.connector.async_iam_connector import AsyncIAMConnector
+from plugin.connector.async_logging_connector import AsyncLoggingConnector
 from plugin.connector.iam_connector import IAMConnector
 from plugin.connector.resource_manager_v3_connector import ResourceManagerV3Connector
-from plugin.connector.logging_connector import LoggingConnector
+from plugin.connector.logging_connector import (
+    LoggingConnector,
+    format_timestamp,
+    get_search_start_time,
+)
+from plugin.connector.policy_analyzer_connector import PolicyAnalyzerConnector
 from plugin.manager.base import ResourceManager
+from plugin.utils.concurrency import get_max_concurrency, ordered_map
+from plugin.utils.error_handlers import dismiss_circuit_breaker
+from plugin.utils.hierarchy_index import HierarchyIndex
 
 _LOGGER = logging.getLogger("spaceone")
 
+SERVICE_ACCOUNT_ASSET_TYPE = "iam.googleapis.com/ServiceAccount"
+SERVICE_ACCOUNT_KEY_ASSET_TYPE = "iam.googleapis.com/ServiceAccountKey"
+SERVICE_ACCOUNT_ACTIVITY_TYPE = "serviceAccountLastAuthentication"
+SERVICE_ACCOUNT_KEY_ACTIVITY_TYPE = "serviceAccountKeyLastAuthentication"
+
 
 class ServiceAccountManager(ResourceManager):
     service = "IAM"
@@ -26,10 +47,9 @@ class ServiceAccountManager(ResourceManager):
         self.iam_connector = None
         self.rm_v3_connector = None
         self.logging_connector = None
-        self.location_info = {
-            "FOLDER": {},
-            "PROJECT": {},
-        }
+        self.policy_analyzer_connector = None
+        self.async_iam_connector = None
+        self.async_logging_connector = None
 
     def collect_cloud_services(
         self, options: dict, secret_data: dict, schema: str
@@ -39,24 +59,294 @@ class ServiceAccountManager(ResourceManager):
         self.logging_connector = LoggingConnector(
             options=options, secret_data=secret_data, schema=schema
         )
+        if options.get("activity_backend") == "policy_analyzer":
+            self.policy_analyzer_connector = PolicyAnalyzerConnector(
+                options, secret_data, schema
+            )
+        if options.get("use_http2"):
+            self.async_iam_connector = AsyncIAMConnector(options, secret_data, schema)
+            self.async_logging_connector = AsyncLoggingConnector(
+                options, secret_data, schema
+            )
 
         # Get all projects
-        projects = self.rm_v3_connector.list_all_projects()
+        hierarchy_index = HierarchyIndex.load_or_build(self.rm_v3_connector, options)
+        projects = hierarchy_index.list_projects()
+        organizations = hierarchy_index.list_organizations()
         if not projects:
-            yield from self.collect_service_accounts(secret_data.get("project_id"))
+            project_targets = [(secret_data.get("project_id"),)]
+        elif options.get("use_asset_inventory") and organizations:
+            project_targets = self.list_asset_inventory_project_targets(
+                options, secret_data, schema, organizations, projects
+            )
         else:
-            for project in projects:
-                if project["projectId"].startswith("sys-"):
-                    continue
+            project_targets = [(project["projectId"],) for project in projects]
+
+        # Listing, activity and key lookups of a project are I/O bound, so many
+        # projects are collected at once
+        for responses in ordered_map(
+            lambda project_target: self.collect_project_service_accounts(
+                *project_target
+            ),
+            project_targets,
+            get_max_concurrency(options),
+        ):
+            yield from responses
+
+    def collect_project_service_accounts(
+        self,
+        project_id: str,
+        service_accounts: list = None,
+        service_account_keys: dict = None,
+    ) -> list:
+        # A project whose accounts could not be listed passes its error through
+        return [
+            (
+                target
+                if isinstance(target, Exception)
+                else self.make_cloud_service_info(*target)
+            )
+            for target in self.list_service_account_targets(
+                project_id, service_accounts, service_account_keys
+            )
+        ]
+
+    def list_asset_inventory_project_targets(
+        self,
+        options: dict,
+        secret_data: dict,
+        schema: str,
+        organizations: list,
+        projects: list,
+    ) -> list:
+        try:
+            asset_connector = AssetConnector(options, secret_data, schema)
+            service_accounts, service_account_keys = self.list_asset_service_accounts(
+                asset_connector, organizations
+            )
+        except Exception as e:
+            _LOGGER.warning(
+                f"[{self.__repr__()}] Failed to list service accounts and keys of "
+                f"{len(organizations)} organizations from Cloud Asset Inventory, "
+                f"listing them in each of {len(projects)} projects instead: {e}"
+            )
+            return [(project["projectId"],) for project in projects]
+
+        return [
+            (
+                project["projectId"],
+                service_accounts.get(project["projectId"], []),
+                service_account_keys,
+            )
+            for project in projects
+        ]
+
+    @staticmethod
+    def list_asset_service_accounts(
+        asset_connector: AssetConnector, organizations: list
+    ) -> tuple:
+        service_accounts = {}
+        service_account_keys = {}
+        for organization in organizations:
+            assets = asset_connector.list_assets(
+                organization["name"],
+                [SERVICE_ACCOUNT_ASSET_TYPE, SERVICE_ACCOUNT_KEY_ASSET_TYPE],
+            )
+            for asset in assets:
+                data = asset.get("resource", {}).get("data", {})
+                if asset.get("assetType") == SERVICE_ACCOUNT_ASSET_TYPE:
+                    project_id = data.get("projectId")
+                    service_accounts.setdefault(project_id, []).append(data)
+                elif data.get("keyType") == "USER_MANAGED":
+                    # Asset names refer to the account by unique ID, key names by email
+                    refs = {
+                        _get_service_account_ref(asset.get("name", "")),
+                        _get_service_account_ref(data.get("name", "")),
+                    }
+                    keys = next(
+                        (
+                            service_account_keys[ref]
+                            for ref in refs
+                            if ref in service_account_keys
+                        ),
+                        [],
+                    )
+                    keys.append(data)
+                    for ref in refs:
+                        service_account_keys[ref] = keys
+
+        return service_accounts, service_account_keys
 
-                yield from self.collect_service_accounts(project["projectId"])
+    def list_service_account_targets(
+        self,
+        project_id: str,
+        service_accounts: list = None,
+        service_account_keys: dict = None,
+    ) -> Generator[tuple, None, None]:
+        if service_accounts is None:
+            try:
+                service_accounts = self.iam_connector.list_service_accounts(project_id)
+            except ERROR_GOOGLE_API_LISTING_INCOMPLETE as e:
+                yield e
+                return
+
+        last_activity_times = None
+        key_activity_times = None
+        if self.policy_analyzer_connector and service_accounts:
+            last_activity_times, key_activity_times = (
+                self.get_policy_analyzer_activities(project_id, service_accounts)
+            )
+
+        if self.async_logging_connector and service_accounts:
+            async_activity_times, async_keys = self.get_async_enrichment(
+                project_id,
+                service_accounts,
+                service_account_keys is None,
+                last_activity_times is None,
+            )
+            if async_keys is not None:
+                service_account_keys = async_keys
+            if async_activity_times is not None:
+                last_activity_times = async_activity_times
+        elif last_activity_times is None and service_accounts:
+            # A few OR-ed Logging queries per project instead of one per account
+            last_activity_times = self.logging_connector.get_last_log_entry_timestamps(
+                project_id,
+                [service_account.get("email") for service_account in service_accounts],
+            )
+
+        if self.policy_analyzer_connector and last_activity_times is not None:
+            # Cloud Logging filled in what Policy Analyzer could not, nothing is missing
+            dismiss_circuit_breaker(self.policy_analyzer_connector, project_id)
+
+        if service_account_keys is None and service_accounts:
+            # One batch round trip per 100 accounts instead of one request per account
+            service_account_keys = self.iam_connector.list_service_account_keys_batch(
+                [service_account.get("email") for service_account in service_accounts],
+                project_id,
+            )
 
-    def collect_service_accounts(self, project_id: str) -> Generator[dict, None, None]:
-        service_accounts = self.iam_connector.list_service_accounts(project_id)
         for service_account in service_accounts:
-            yield self.make_cloud_service_info(service_account, project_id)
+            keys = None
+            if service_account_keys is not None:
+                keys = service_account_keys.get(
+                    service_account.get("uniqueId")
+                ) or service_account_keys.get(service_account.get("email"), [])
+            yield (
+                service_account,
+                project_id,
+                keys,
+                last_activity_times,
+                key_activity_times,
+            )
+
+    def get_policy_analyzer_activities(
+        self, project_id: str, service_accounts: list
+    ) -> tuple:
+        # Last authentication of every account and key of the project in bulk
+        account_activities = self.policy_analyzer_connector.query_activities(
+            project_id, SERVICE_ACCOUNT_ACTIVITY_TYPE
+        )
+        key_activities = self.policy_analyzer_connector.query_activities(
+            project_id, SERVICE_ACCOUNT_KEY_ACTIVITY_TYPE
+        )
+        if account_activities is None or key_activities is None:
+            failed = [
+                activity_type
+                for activity_type, activities in [
+                    (SERVICE_ACCOUNT_ACTIVITY_TYPE, account_activities),
+                    (SERVICE_ACCOUNT_KEY_ACTIVITY_TYPE, key_activities),
+                ]
+                if activities is None
+            ]
+            _LOGGER.debug(
+                f"[{self.__repr__()}] Policy Analyzer failed to query "
+                f"{', '.join(failed)} of {project_id}, looking up account activity "
+                f"in Cloud Logging instead (keys get no last activity)"
+            )
+            return None, None
 
-    def make_cloud_service_info(self, service_account: dict, project_id: str) -> dict:
+        # Authentications older than the log search period are not reported
+        search_start_time = format_timestamp(
+            get_search_start_time(
+                self.logging_connector.log_search_period, datetime.utcnow()
+            )
+        )
+
+        account_activity_times = {}
+        for account_activity in account_activities:
+            activity = account_activity.get("activity", {})
+            last_authenticated_time = activity.get("lastAuthenticatedTime")
+            if last_authenticated_time and last_authenticated_time >= search_start_time:
+                for full_resource_name in [
+                    account_activity.get("fullResourceName", ""),
+                    activity.get("serviceAccount", {}).get("fullResourceName", ""),
+                ]:
+                    ref = _get_service_account_ref(full_resource_name)
+                    account_activity_times[ref] = last_authenticated_time
+
+        key_activity_times = {}
+        for key_activity in key_activities:
+            activity = key_activity.get("activity", {})
+            last_authenticated_time = activity.get("lastAuthenticatedTime")
+            if last_authenticated_time and last_authenticated_time >= search_start_time:
+                key_id = key_activity.get("fullResourceName", "").split("/keys/")[-1]
+                key_activity_times[key_id] = last_authenticated_time
+
+        last_activity_times = {
+            service_account.get("email"): account_activity_times.get(
+                service_account.get("uniqueId")
+            )
+            or account_activity_times.get(service_account.get("email"))
+            for service_account in service_accounts
+        }
+        return last_activity_times, key_activity_times
+
+    def get_async_enrichment(
+        self,
+        project_id: str,
+        service_accounts: list,
+        fetch_keys: bool,
+        fetch_activity: bool = True,
+    ) -> tuple:
+        # Fan out all lookups of a project over multiplexed HTTP/2 connections
+        emails = [service_account.get("email") for service_account in service_accounts]
+
+        async def _gather():
+            timestamps = gather_with_limit(
+                [
+                    self.async_logging_connector.get_last_log_entry_timestamp(
+                        project_id, email
+                    )
+                    for email in (emails if fetch_activity else [])
+                ],
+                ASYNC_MAX_CONCURRENT_REQUESTS,
+            )
+            keys = gather_with_limit(
+                [
+                    self.async_iam_connector.list_service_account_keys(
+                        email, project_id
+                    )
+                    for email in (emails if fetch_keys else [])
+                ],
+                ASYNC_MAX_CONCURRENT_REQUESTS,
+            )
+            return await asyncio.gather(timestamps, keys)
+
+        timestamps, keys = run_async(_gather())
+        return (
+            dict(zip(emails, timestamps)) if fetch_activity else None,
+            dict(zip(emails, keys)) if fetch_keys else None,
+        )
+
+    def make_cloud_service_info(
+        self,
+        service_account: dict,
+        project_id: str,
+        keys: list = None,
+        last_activity_times: dict = None,
+        key_activity_times: dict = None,
+    ) -> dict:
         name = service_account.get("displayName")
         email = service_account.get("email")
         resource_id = service_account.get("name")
@@ -66,15 +356,21 @@ class ServiceAccountManager(ResourceManager):
             service_account["status"] = "DISABLED"
         else:
             service_account["status"] = "ENABLED"
-        service_account["lastActivityTime"] = (
-            self.logging_connector.get_last_log_entry_timestamp(project_id, email)
-        )
+        if last_activity_times is not None and email in last_activity_times:
+            service_account["lastActivityTime"] = last_activity_times[email]
+        else:
+            service_account["lastActivityTime"] = (
+                self.logging_connector.get_last_log_entry_timestamp(project_id, email)
+            )
         service_account["lastActivityDescription"] = (
             f"Activity log found in the past {self.logging_connector.log_search_period.lower()}"
             if service_account["lastActivityTime"]
             else f"No activity log found in the past {self.logging_connector.log_search_period.lower()}"
         )
-        keys = self.get_service_account_keys(email, project_id)
+        keys = self.get_service_account_keys(email, project_id, keys)
+        if key_activity_times is not None:
+            for key in keys:
+                key["lastActivityTime"] = key_activity_times.get(key["name"])
         service_account["keys"] = keys
         service_account["keyCount"] = len(keys)
 
@@ -94,8 +390,12 @@ class ServiceAccountManager(ResourceManager):
             # data_format="grpc",
         )
 
-    def get_service_account_keys(self, email: str, project_id: str) -> list:
-        keys = self.iam_connector.list_service_account_keys(email, project_id)
+    def get_service_account_keys(
+        self, email: str, project_id: str, keys: list = None
+    ) -> list:
+        if keys is None:
+            keys = self.iam_connector.list_service_account_keys(email, project_id)
+
         for key in keys:
             key_full_name = key.get("name")
             key["name"] = key_full_name.split("/")[-1]
@@ -109,3 +409,8 @@ class ServiceAccountManager(ResourceManager):
                     key["status"] = "EXPIRED"
 
         return keys
+
+
+def _get_service_account_ref(name: str) -> str:
+    # projects/{project}/serviceAccounts/{email or unique_id}/keys/{key_id}
+    return name.split("/serviceAccounts/")[-1].split("/")[0]
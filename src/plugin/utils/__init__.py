@@ -1 +1,2 @@
 from plugin.utils.error_handlers import *
+from plugin.utils.request_cache import *
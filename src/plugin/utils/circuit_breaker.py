@@ -0,0 +1,132 @@
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Generator
+
+from spaceone.core.error import ERROR_BASE
+
+__all__ = [
+    "ERROR_GOOGLE_API_UNAVAILABLE",
+    "CircuitBreaker",
+    "CircuitBreakerRegistry",
+    "circuit_breaker_scope",
+    "iter_in_cloud_service_type_scope",
+    "get_circuit_breaker_registry",
+]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_CIRCUIT_BREAKER_REGISTRY = contextvars.ContextVar(
+    "circuit_breaker_registry", default=None
+)
+_CLOUD_SERVICE_TYPE = contextvars.ContextVar(
+    "circuit_breaker_cloud_service_type", default=None
+)
+
+
+class ERROR_GOOGLE_API_UNAVAILABLE(ERROR_BASE):
+    _status_code = "PERMISSION_DENIED"
+    _message = (
+        "{api} API is unavailable for project {project_id} ({reason}), "
+        "skipped {skipped} calls: {message}"
+    )
+
+
+class CircuitBreaker:
+    def __init__(self, api: str, project_id: str, reason: str, message: str):
+        self.api = api
+        self.project_id = project_id
+        self.reason = reason
+        self.message = message
+        self.skipped = 0
+        # Set once a fallback covered the skipped calls, the breaker still skips them
+        self.dismissed = False
+        # (cloud_service_group, cloud_service_type) of the managers whose calls were cut
+        self.cloud_service_types = set()
+
+    def add_cloud_service_type(self, cloud_service_type: tuple) -> None:
+        if cloud_service_type is not None:
+            self.cloud_service_types.add(cloud_service_type)
+
+    def to_error(self) -> ERROR_GOOGLE_API_UNAVAILABLE:
+        return ERROR_GOOGLE_API_UNAVAILABLE(
+            api=self.api,
+            project_id=self.project_id,
+            reason=self.reason,
+            skipped=self.skipped,
+            message=self.message,
+        )
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, api: str, project_id: str, skip: bool = True) -> bool:
+        # skip counts the call being asked about as one the breaker cut
+        with self._lock:
+            breaker = self._breakers.get((api, project_id))
+            if breaker is None:
+                return False
+            if skip:
+                breaker.skipped += 1
+                breaker.add_cloud_service_type(_CLOUD_SERVICE_TYPE.get())
+            return True
+
+    def open(self, api: str, project_id: str, reason: str, message: str) -> None:
+        with self._lock:
+            if (api, project_id) in self._breakers:
+                return
+            breaker = self._breakers[(api, project_id)] = CircuitBreaker(
+                api, project_id, reason, message
+            )
+            breaker.add_cloud_service_type(_CLOUD_SERVICE_TYPE.get())
+        _LOGGER.warning(
+            f"[CircuitBreaker] Skip {api} API calls for project {project_id}: {reason}"
+        )
+
+    def dismiss(self, api: str, project_id: str) -> None:
+        with self._lock:
+            breaker = self._breakers.get((api, project_id))
+            if breaker is not None:
+                breaker.dismissed = True
+
+    def list_open_breakers(self) -> list:
+        # Dismissed breakers are left out of the errors of the collect
+        with self._lock:
+            return [
+                breaker for breaker in self._breakers.values() if not breaker.dismissed
+            ]
+
+
+@contextmanager
+def circuit_breaker_scope():
+    registry = CircuitBreakerRegistry()
+    previous = _CIRCUIT_BREAKER_REGISTRY.get()
+    _CIRCUIT_BREAKER_REGISTRY.set(registry)
+    try:
+        yield registry
+    finally:
+        _CIRCUIT_BREAKER_REGISTRY.set(previous)
+
+
+def get_circuit_breaker_registry():
+    return _CIRCUIT_BREAKER_REGISTRY.get()
+
+
+def iter_in_cloud_service_type_scope(
+    iterator, cloud_service_group: str, cloud_service_type: str
+) -> Generator:
+    # Breakers opened or hit while the iterator runs are reported for this cloud
+    # service type. Each step runs in one context, wherever the caller iterates from
+    context = contextvars.copy_context()
+    context.run(_CLOUD_SERVICE_TYPE.set, (cloud_service_group, cloud_service_type))
+    iterator = iter(iterator)
+    while True:
+        try:
+            item = context.run(next, iterator)
+        except StopIteration:
+            return
+        yield item
@@ -0,0 +1,228 @@
+import contextvars
+import itertools
+import logging
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generator, Iterable
+
+from plugin.conf.global_conf import (
+    AIMD_ACQUIRE_TIMEOUT,
+    AIMD_BASELINE_DECAY,
+    AIMD_DECREASE_FACTOR,
+    AIMD_INITIAL_WINDOW,
+    AIMD_LATENCY_SAMPLES,
+    AIMD_LATENCY_TOLERANCE,
+    AIMD_MAX_WINDOW,
+    AIMD_MIN_WINDOW,
+    AIMD_THROTTLE_STATUS_CODES,
+    DEFAULT_MAX_CONCURRENCY,
+)
+
+__all__ = [
+    "get_max_concurrency",
+    "ordered_map",
+    "merge_generators",
+    "AdaptiveConcurrencyLimiter",
+    "get_concurrency_limiter",
+    "get_concurrency_windows",
+]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+def get_max_concurrency(options: dict) -> int:
+    try:
+        return max(int(options.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)), 1)
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_CONCURRENCY
+
+
+def ordered_map(
+    func: Callable, items: Iterable, max_workers: int
+) -> Generator[object, None, None]:
+    if max_workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    # Results are yielded in input order with at most 2 * max_workers calls in flight
+    items = iter(items)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = deque()
+
+    def _submit(item):
+        # Worker threads do not inherit contextvars such as the request cache
+        context = contextvars.copy_context()
+        futures.append(executor.submit(context.run, func, item))
+
+    try:
+        for item in itertools.islice(items, max_workers * 2):
+            _submit(item)
+
+        while futures:
+            result = futures.popleft().result()
+            for item in itertools.islice(items, 1):
+                _submit(item)
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class _GeneratorDone:
+    def __init__(self, error: Exception = None):
+        self.error = error
+
+
+def merge_generators(
+    generators: list, max_queue_size: int
+) -> Generator[object, None, None]:
+    # Each generator runs on its own thread; the bounded queue applies backpressure
+    items = queue.Queue(maxsize=max_queue_size)
+    stopped = threading.Event()
+
+    def _put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(generator):
+        error = None
+        try:
+            for item in generator:
+                if not _put(item):
+                    break
+        except Exception as e:
+            error = e
+        finally:
+            generator.close()
+            _put(_GeneratorDone(error))
+
+    threads = []
+    for generator in generators:
+        context = contextvars.copy_context()
+        thread = threading.Thread(
+            target=context.run, args=(_produce, generator), daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    try:
+        remaining = len(threads)
+        while remaining:
+            item = items.get()
+            if isinstance(item, _GeneratorDone):
+                remaining -= 1
+                if item.error is not None:
+                    raise item.error
+            else:
+                yield item
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, api: str):
+        self.api = api
+        self.window = float(AIMD_INITIAL_WINDOW)
+        self.in_flight = 0
+        self.latencies = deque(maxlen=AIMD_LATENCY_SAMPLES)
+        self.baseline_p95 = None
+        self._decreased_at = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, timeout: float = AIMD_ACQUIRE_TIMEOUT) -> bool:
+        # Returns False when no slot freed up in time. The request is still counted,
+        # a stuck slot must not stall every collect of the worker
+        with self._condition:
+            acquired = self._condition.wait_for(
+                lambda: self.in_flight < int(self.window), timeout
+            )
+            if not acquired:
+                _LOGGER.warning(
+                    f"[AdaptiveConcurrencyLimiter] {self.api} waited {timeout}s "
+                    f"for a slot ({self.in_flight} in flight), sending anyway"
+                )
+            self.in_flight += 1
+            return acquired
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight >= int(self.window):
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency: float, status: int = None) -> None:
+        # status is None when the request failed without a response
+        with self._condition:
+            self.in_flight -= 1
+            self.latencies.append(latency)
+            p95 = self._get_p95()
+
+            if status is None or status in AIMD_THROTTLE_STATUS_CODES:
+                self._decrease(f"status {status}")
+            elif (
+                self.baseline_p95 is not None
+                and p95 > self.baseline_p95 * AIMD_LATENCY_TOLERANCE
+            ):
+                self._decrease(f"p95 latency {p95:.2f}s")
+            else:
+                # About +1 per window of healthy responses
+                self.window = min(self.window + 1 / self.window, AIMD_MAX_WINDOW)
+
+            if len(self.latencies) == self.latencies.maxlen:
+                if self.baseline_p95 is None:
+                    self.baseline_p95 = p95
+                self.baseline_p95 = min(self.baseline_p95 * AIMD_BASELINE_DECAY, p95)
+
+            self._condition.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        # Responses of requests sent before the last cut should not cut again
+        now = time.monotonic()
+        if now - self._decreased_at < self._get_p95():
+            return
+
+        self._decreased_at = now
+        self.window = max(self.window * AIMD_DECREASE_FACTOR, AIMD_MIN_WINDOW)
+        self.latencies.clear()
+        _LOGGER.debug(
+            f"[AdaptiveConcurrencyLimiter] {self.api} window decreased to "
+            f"{self.window:.1f} ({reason})"
+        )
+
+    def _get_p95(self) -> float:
+        if not self.latencies:
+            return 0
+        latencies = sorted(self.latencies)
+        return latencies[max(math.ceil(len(latencies) * 0.95) - 1, 0)]
+
+
+_CONCURRENCY_LIMITERS = {}
+_CONCURRENCY_LIMITERS_LOCK = threading.Lock()
+
+
+def get_concurrency_limiter(api: str) -> AdaptiveConcurrencyLimiter:
+    with _CONCURRENCY_LIMITERS_LOCK:
+        limiter = _CONCURRENCY_LIMITERS.get(api)
+        if limiter is None:
+            limiter = _CONCURRENCY_LIMITERS[api] = AdaptiveConcurrencyLimiter(api)
+        return limiter
+
+
+def get_concurrency_windows() -> dict:
+    with _CONCURRENCY_LIMITERS_LOCK:
+        return {
+            api: round(limiter.window, 1)
+            for api, limiter in sorted(_CONCURRENCY_LIMITERS.items())
+        }
@@ -1,83 +1,300 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import json
 import logging
-import os
+import random
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
 from time import sleep
 
-import googleapiclient.discovery
-import httplib2
-import socks
-from google_auth_httplib2 import AuthorizedHttp
+from plugin.conf.global_conf import (
+    PERMISSION_DENIED_REASONS,
+    RETRY_BASE_DELAY,
+    RETRY_BUDGET,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+    RETRYABLE_STATUS_CODES,
+    SERVICE_DISABLED_REASONS,
+)
+from plugin.utils.circuit_breaker import get_circuit_breaker_registry
 
 _LOGGER = logging.getLogger("spaceone")
 
+_TRANSPORT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    socket.timeout,
+    socket.gaierror,
+)
+
+_RETRY_BUDGET = contextvars.ContextVar("retry_budget", default=None)
+
+
+class RetryBudget:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+@contextmanager
+def retry_budget_scope(limit: int = RETRY_BUDGET):
+    # Retries of all connectors in one collect draw from the same budget
+    budget = RetryBudget(limit)
+    previous = _RETRY_BUDGET.get()
+    _RETRY_BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _RETRY_BUDGET.set(previous)
+
+
+def get_error_status(error: Exception):
+    # googleapiclient HttpError and httpx HTTPStatusError
+    if hasattr(error, "resp") and hasattr(error.resp, "status"):
+        return int(error.resp.status)
+    response = getattr(error, "response", None)
+    if response is not None and hasattr(response, "status_code"):
+        return int(response.status_code)
+    return None
+
+
+def get_error_reasons(error: Exception) -> set:
+    # e.g. {"error": {"status": "PERMISSION_DENIED", "details": [{"reason": "SERVICE_DISABLED"}]}}
+    error_info = _get_error_info(error)
+    reasons = {error_info.get("status")}
+    for detail in error_info.get("details", []) + error_info.get("errors", []):
+        if isinstance(detail, dict):
+            reasons.add(detail.get("reason"))
+    reasons.discard(None)
+    return reasons
+
+
+def get_error_message(error: Exception) -> str:
+    return _get_error_info(error).get("message") or str(error)
+
+
+def _get_error_info(error: Exception) -> dict:
+    content = getattr(error, "content", None)
+    if content is None and getattr(error, "response", None) is not None:
+        content = getattr(error.response, "content", None)
+
+    try:
+        error_info = json.loads(content).get("error", {})
+    except (TypeError, ValueError, AttributeError):
+        return {}
+    return error_info if isinstance(error_info, dict) else {}
+
+
+def is_retryable_error(error: Exception) -> bool:
+    status = get_error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+
+    if isinstance(error, _TRANSPORT_ERRORS):
+        return True
+
+    # Client libraries are imported lazily; one that is not loaded raised nothing
+    httplib2 = sys.modules.get("httplib2")
+    if httplib2 is not None and isinstance(error, httplib2.HttpLib2Error):
+        return True
+
+    google_auth_exceptions = sys.modules.get("google.auth.exceptions")
+    if google_auth_exceptions is not None and isinstance(
+        error, google_auth_exceptions.TransportError
+    ):
+        return True
+
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+def get_retry_delay(error: Exception, trial: int) -> float:
+    retry_after = _get_retry_after(error)
+    if retry_after is not None:
+        return min(retry_after, RETRY_MAX_DELAY)
+
+    # Capped exponential backoff with full jitter
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**trial))
+
+
+def _get_retry_after(error: Exception):
+    headers = getattr(error, "resp", None)
+    if headers is None and getattr(error, "response", None) is not None:
+        headers = error.response.headers
+    if headers is None:
+        return None
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_circuit_breaker_project(signature, self, args, kwargs) -> tuple:
+    try:
+        project_id = signature.bind(self, *args, **kwargs).arguments.get("project_id")
+    except TypeError:
+        project_id = None
+
+    if project_id:
+        return project_id, True
+    return getattr(self, "project_id", None), False
+
+
+def open_circuit_breaker(
+    self, error: Exception, project_id: str, project_scoped: bool
+) -> None:
+    registry = get_circuit_breaker_registry()
+    if registry is None or get_error_status(error) != 403:
+        return
+
+    reasons = get_error_reasons(error)
+    breaker_reasons = [
+        reason for reason in SERVICE_DISABLED_REASONS if reason in reasons
+    ]
+    if project_scoped:
+        # Calls without a project argument may target a single folder or organization
+        breaker_reasons += [
+            reason for reason in PERMISSION_DENIED_REASONS if reason in reasons
+        ]
+
+    if breaker_reasons:
+        registry.open(
+            self.google_client_service,
+            project_id,
+            breaker_reasons[0],
+            get_error_message(error),
+        )
+
+
+def is_circuit_breaker_open(self, project_id: str, skip: bool = True) -> bool:
+    registry = get_circuit_breaker_registry()
+    return registry is not None and registry.is_open(
+        self.google_client_service, project_id, skip
+    )
+
+
+def dismiss_circuit_breaker(self, project_id: str) -> None:
+    registry = get_circuit_breaker_registry()
+    if registry is not None:
+        registry.dismiss(self.google_client_service, project_id)
+
+
+def _invalidate_token(self) -> bool:
+    credentials = getattr(self, "credentials", None)
+    if not hasattr(credentials, "invalidate"):
+        return False
+    credentials.invalidate()
+    return True
+
+
+def _should_retry(self, method, args, kwargs, error: Exception, trial: int) -> bool:
+    if get_error_status(error) == 401:
+        # The shared token may have been revoked; retry once with a new one
+        if trial > 0 or not _invalidate_token(self):
+            return False
+    elif not is_retryable_error(error):
+        _LOGGER.debug(
+            f"{self.__repr__()} Permanent error in {method.__name__}({args}, {kwargs}): {str(error)}"
+        )
+        return False
+
+    if trial + 1 >= RETRY_MAX_ATTEMPTS:
+        return False
+
+    budget = _RETRY_BUDGET.get()
+    if budget is not None and not budget.acquire():
+        _LOGGER.warning(
+            f"{self.__repr__()} Retry budget of this collect is exhausted ({budget.limit})"
+        )
+        return False
+
+    _LOGGER.debug(
+        f"{self.__repr__()} Retrying {method.__name__}({args}, {kwargs}, trial={trial + 1}): {str(error)}"
+    )
+    return True
+
 
 def api_retry_handler(default_response=None):
     def decorator(method):
-        @staticmethod
-        def create_http_client():
-            https_proxy = os.environ.get("HTTPS_PROXY") or os.environ.get("https_proxy")
-
-            if https_proxy:
-                # _LOGGER.info(
-                #     f"** Using proxy in environment variable HTTPS_PROXY/https_proxy: {https_proxy}"
-                # ) # TOO MANY LOGGING
-                try:
-                    proxy_url = https_proxy.replace("http://", "").replace(
-                        "https://", ""
-                    )
-                    if ":" in proxy_url:
-                        proxy_host, proxy_port = proxy_url.split(":", 1)
-                        proxy_port = int(proxy_port)
-
-                    proxy_info = httplib2.ProxyInfo(
-                        proxy_host=proxy_host,
-                        proxy_port=proxy_port,
-                        proxy_type=socks.PROXY_TYPE_HTTP,
-                    )
-
-                    return httplib2.Http(
-                        proxy_info=proxy_info, disable_ssl_certificate_validation=True
-                    )
-                except Exception as e:
-                    _LOGGER.warning(
-                        f"Failed to configure proxy. Using direct connection.: {e}. "
-                    )
-                    return None
-            else:
-                return None
+        signature = inspect.signature(method)
 
+        @functools.wraps(method)
         def wrapper(self, *args, **kwargs):
+            project_id, project_scoped = _get_circuit_breaker_project(
+                signature, self, args, kwargs
+            )
+            if is_circuit_breaker_open(self, project_id):
+                return default_response
+
             trial = 0
-            while trial < 10:
+            while True:
                 try:
                     return method(self, *args, **kwargs)
                 except Exception as e:
-                    _LOGGER.debug(
-                        f"{self.__repr__()} Retrying {method.__name__}({args}, {kwargs}, trial={trial + 1}): {str(e)}"
-                    )
-                    sleep(1 + 0.002**trial)
-
-                    # Proxy HTTP client creation
-                    proxy_http = create_http_client()
-                    if proxy_http:
-                        self.client = googleapiclient.discovery.build(
-                            self.google_client_service,
-                            self.version,
-                            http=AuthorizedHttp(
-                                self.credentials.with_scopes(
-                                    [
-                                        "https://www.googleapis.com/auth/cloud-platform"
-                                    ]  # FOR PROXY SCOPE SUPPORT
-                                ),
-                                http=proxy_http,
-                            ),
-                        )
-                    else:
-                        self.client = googleapiclient.discovery.build(
-                            self.google_client_service,
-                            self.version,
-                            credentials=self.credentials,
-                        )
+                    open_circuit_breaker(self, e, project_id, project_scoped)
+                    if not _should_retry(self, method, args, kwargs, e, trial):
+                        break
+                    if get_error_status(e) is None and hasattr(self, "reset_client"):
+                        # A transport error may have left the pooled client's
+                        # connection broken, so the retry leases a fresh one
+                        self.reset_client()
+                    sleep(get_retry_delay(e, trial))
+                    trial += 1
+            _LOGGER.error(
+                f"{self.__repr__()} Failed to {method.__name__}({args}, {kwargs})"
+            )
+            return default_response
+
+        return wrapper
+
+    return decorator
 
+
+def async_api_retry_handler(default_response=None):
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            project_id, project_scoped = _get_circuit_breaker_project(
+                signature, self, args, kwargs
+            )
+            if is_circuit_breaker_open(self, project_id):
+                return default_response
+
+            trial = 0
+            while True:
+                try:
+                    return await method(self, *args, **kwargs)
+                except Exception as e:
+                    open_circuit_breaker(self, e, project_id, project_scoped)
+                    if not _should_retry(self, method, args, kwargs, e, trial):
+                        break
+                    await asyncio.sleep(get_retry_delay(e, trial))
                     trial += 1
             _LOGGER.error(
                 f"{self.__repr__()} Failed to {method.__name__}({args}, {kwargs})"
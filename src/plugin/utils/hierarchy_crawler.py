@@ -0,0 +1,127 @@
+import logging
+import re
+
+from plugin.conf.global_conf import DEFAULT_PROJECT_FILTER
+from plugin.utils.concurrency import get_max_concurrency, ordered_map
+
+__all__ = ["ProjectFilter", "HierarchyCrawler"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class ProjectFilter:
+    def __init__(self, options: dict):
+        project_filter = merge_project_filter(options.get("project_filter") or {})
+        self.include_project_ids = [
+            re.compile(pattern) for pattern in project_filter["include_project_ids"]
+        ]
+        self.exclude_project_ids = [
+            re.compile(pattern) for pattern in project_filter["exclude_project_ids"]
+        ]
+        self.labels = project_filter["labels"]
+        self.lifecycle_states = project_filter["lifecycle_states"]
+
+    def __repr__(self):
+        return (
+            f"ProjectFilter(include={[p.pattern for p in self.include_project_ids]}, "
+            f"exclude={[p.pattern for p in self.exclude_project_ids]}, "
+            f"labels={sorted(self.labels.items())}, states={sorted(self.lifecycle_states)})"
+        )
+
+    @property
+    def show_deleted(self) -> bool:
+        return "DELETE_REQUESTED" in self.lifecycle_states
+
+    def match(self, project: dict) -> bool:
+        project_id = project.get("projectId", "")
+
+        if project.get("state", "ACTIVE") not in self.lifecycle_states:
+            return False
+
+        if self.include_project_ids and not any(
+            pattern.search(project_id) for pattern in self.include_project_ids
+        ):
+            return False
+
+        if any(pattern.search(project_id) for pattern in self.exclude_project_ids):
+            return False
+
+        project_labels = project.get("labels", {})
+        for key, value in self.labels.items():
+            if project_labels.get(key) != value:
+                return False
+
+        return True
+
+
+def merge_project_filter(project_filter: dict) -> dict:
+    # User patterns, labels and states are added to the defaults, so an exclude list
+    # of the user keeps the default exclusion of e.g. Apps Script projects
+    merged = {}
+    for key, default in DEFAULT_PROJECT_FILTER.items():
+        value = project_filter.get(key)
+        if not value:
+            merged[key] = default
+        elif isinstance(default, dict):
+            merged[key] = {**default, **value}
+        else:
+            merged[key] = list(dict.fromkeys(default + list(value)))
+    return merged
+
+
+class HierarchyCrawler:
+    def __init__(self, rm_v3_connector, options: dict):
+        self.rm_v3_connector = rm_v3_connector
+        self.project_filter = ProjectFilter(options)
+        self.max_concurrency = get_max_concurrency(options)
+
+    def crawl(self) -> dict:
+        organizations = self.rm_v3_connector.search_organizations()
+        folders = {}
+        projects = {}
+        visited = {organization["name"] for organization in organizations}
+        parents = list(visited)
+        unreachable_folders_added = False
+
+        # Breadth-first walk, one hierarchy level per round of parallel calls
+        while parents:
+            children = ordered_map(self._list_children, parents, self.max_concurrency)
+            next_parents = []
+            for child_folders, child_projects in children:
+                for folder in child_folders:
+                    if folder["name"] not in visited:
+                        visited.add(folder["name"])
+                        folders[folder["name"]] = folder
+                        next_parents.append(folder["name"])
+
+                for project in child_projects:
+                    if self.project_filter.match(project):
+                        projects[project["projectId"]] = project
+
+            if not next_parents and not unreachable_folders_added:
+                # Folders visible to the caller whose ancestors are not
+                unreachable_folders_added = True
+                for folder in self.rm_v3_connector.search_folders():
+                    if folder["name"] not in visited:
+                        visited.add(folder["name"])
+                        folders[folder["name"]] = folder
+                        next_parents.append(folder["name"])
+
+            parents = next_parents
+
+        _LOGGER.debug(
+            f"[HierarchyCrawler] Crawled {len(organizations)} organizations, "
+            f"{len(folders)} folders, {len(projects)} projects ({self.project_filter})"
+        )
+        return {
+            "organizations": organizations,
+            "folders": list(folders.values()),
+            "projects": list(projects.values()),
+        }
+
+    def _list_children(self, parent: str) -> tuple:
+        child_folders = self.rm_v3_connector.list_folders(parent)
+        child_projects = self.rm_v3_connector.list_projects(
+            parent, show_deleted=self.project_filter.show_deleted
+        )
+        return child_folders, child_projects
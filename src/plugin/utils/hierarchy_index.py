@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+
+from plugin.conf.global_conf import HIERARCHY_CACHE_TTL
+from plugin.utils.hierarchy_crawler import HierarchyCrawler, ProjectFilter
+from plugin.utils.local_store import LocalStore
+
+__all__ = ["HierarchyIndex"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class HierarchyIndex:
+    _store = LocalStore("hierarchy")
+    _indexes = {}
+    _key_locks = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        organizations: list,
+        folders: list,
+        projects: list,
+        created_at: float = None,
+    ):
+        self.organizations = {org["name"]: org for org in organizations}
+        self.folders = {folder["name"]: folder for folder in folders}
+        self.projects = {project["projectId"]: project for project in projects}
+        self.project_names = {
+            project["name"]: project["projectId"] for project in projects
+        }
+        # Kept from the original crawl when loaded from disk, so the TTL is not extended
+        self.created_at = created_at or time.time()
+        self._locations = {}
+        self._build_locations()
+
+    def list_organizations(self) -> list:
+        return list(self.organizations.values())
+
+    def list_folders(self) -> list:
+        return list(self.folders.values())
+
+    def list_projects(self) -> list:
+        return list(self.projects.values())
+
+    def get_folder_location(self, folder_id: str):
+        return self._locations.get(folder_id)
+
+    def get_project_location(self, project_id: str):
+        project = self.projects.get(project_id)
+        if project is None:
+            return None
+        return self._locations.get(project["name"])
+
+    def get_parent_chain(self, resource_name: str) -> list:
+        chain = []
+        parent = self._get_resource(resource_name).get("parent")
+        while parent and parent not in chain:
+            chain.append(parent)
+            parent = self._get_resource(parent).get("parent")
+        return chain
+
+    def to_dict(self) -> dict:
+        return {
+            "organizations": self.list_organizations(),
+            "folders": self.list_folders(),
+            "projects": self.list_projects(),
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def build(cls, rm_v3_connector, options: dict) -> "HierarchyIndex":
+        return cls(**HierarchyCrawler(rm_v3_connector, options).crawl())
+
+    @classmethod
+    def load_or_build(cls, rm_v3_connector, options: dict) -> "HierarchyIndex":
+        ttl = options.get("hierarchy_cache_ttl", HIERARCHY_CACHE_TTL)
+        key = cls._get_key(rm_v3_connector, options)
+
+        # Single-flight per key: collects of other secrets do not wait for this crawl
+        with cls._get_key_lock(key):
+            index = cls._indexes.get(key)
+            if index and time.time() - index.created_at <= ttl:
+                return index
+
+            if ttl:
+                cached = cls._store.get(key, ttl=ttl)
+                if cached is not None:
+                    index = cls(**cached)
+                    if time.time() - index.created_at <= ttl:
+                        cls._indexes[key] = index
+                        return index
+
+            index = cls.build(rm_v3_connector, options)
+            if ttl:
+                cls._indexes[key] = index
+                cls._store.set(key, index.to_dict())
+            return index
+
+    @classmethod
+    def _get_key_lock(cls, key: str) -> threading.Lock:
+        with cls._lock:
+            return cls._key_locks.setdefault(key, threading.Lock())
+
+    @classmethod
+    def invalidate(cls, rm_v3_connector, options: dict) -> None:
+        key = cls._get_key(rm_v3_connector, options)
+        _LOGGER.debug(f"[HierarchyIndex] Invalidate hierarchy index: {key}")
+        with cls._get_key_lock(key):
+            cls._indexes.pop(key, None)
+            cls._store.delete(key)
+
+    @staticmethod
+    def _get_key(rm_v3_connector, options: dict) -> str:
+        return (
+            f"{rm_v3_connector.secret_digest}:"
+            f"{rm_v3_connector.project_id}:"
+            f"{ProjectFilter(options)}"
+        )
+
+    def _get_resource(self, resource_name: str) -> dict:
+        if resource_name.startswith("organizations/"):
+            return self.organizations.get(resource_name, {})
+        elif resource_name.startswith("folders/"):
+            return self.folders.get(resource_name, {})
+        else:
+            project_id = self.project_names.get(resource_name)
+            return self.projects.get(project_id, {})
+
+    def _build_locations(self) -> None:
+        for organization_id, organization in self.organizations.items():
+            self._locations[organization_id] = organization.get("displayName")
+
+        for resource_name in list(self.folders) + list(self.project_names):
+            self._resolve_location(resource_name, set())
+
+    def _resolve_location(self, resource_name: str, visiting: set):
+        if resource_name in self._locations:
+            return self._locations[resource_name]
+
+        resource = self._get_resource(resource_name)
+        parent = resource.get("parent")
+        if not resource or not parent or resource_name in visiting:
+            return None
+
+        visiting.add(resource_name)
+        parent_location = self._resolve_location(parent, visiting)
+        if parent_location is None:
+            return None
+
+        location = f"{parent_location} > {resource.get('displayName')}"
+        self._locations[resource_name] = location
+        return location
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from plugin.conf.global_conf import LOCAL_CACHE_DIR
+
+__all__ = ["LocalStore"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class LocalStore:
+    def __init__(self, namespace: str, cache_dir: str = LOCAL_CACHE_DIR):
+        self.namespace = namespace
+        self.path = os.path.join(cache_dir, namespace)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl: int = None):
+        file_path = self._get_file_path(key)
+        try:
+            with open(file_path, "r") as f:
+                item = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            _LOGGER.debug(f"[LocalStore] Failed to read {self.namespace} cache: {e}")
+            return None
+
+        if ttl is not None and time.time() - item.get("created_at", 0) > ttl:
+            return None
+
+        return item.get("value")
+
+    def set(self, key: str, value) -> None:
+        file_path = self._get_file_path(key)
+        item = {"created_at": time.time(), "value": value}
+        try:
+            with self._lock:
+                os.makedirs(self.path, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(item, f)
+                os.replace(tmp_path, file_path)
+        except Exception as e:
+            _LOGGER.debug(f"[LocalStore] Failed to write {self.namespace} cache: {e}")
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._get_file_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _get_file_path(self, key: str) -> str:
+        file_name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.path, f"{file_name}.json")
@@ -0,0 +1,68 @@
+import logging
+import threading
+import time
+
+from plugin.conf.global_conf import API_RATE_LIMITS, RATE_LIMIT_BURST_SECONDS
+
+__all__ = ["TokenBucket", "get_token_bucket"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_TOKEN_BUCKETS = {}
+_TOKEN_BUCKETS_LOCK = threading.Lock()
+
+
+class TokenBucket:
+    def __init__(self, requests_per_minute: float):
+        self.rate = 0
+        self.capacity = 0
+        self.tokens = 0
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.set_rate(requests_per_minute)
+        self.tokens = self.capacity
+
+    def set_rate(self, requests_per_minute: float) -> None:
+        with self._lock:
+            self.rate = requests_per_minute / 60
+            self.capacity = max(self.rate * RATE_LIMIT_BURST_SECONDS, 1)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def reserve(self, tokens: int = 1) -> float:
+        # Takes the tokens right away (possibly going into debt) and returns how
+        # long the caller has to wait, so concurrent callers are paced in order
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.tokens + (now - self.updated_at) * self.rate, self.capacity
+            )
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens: int = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+
+def get_token_bucket(api: str, quota_scope: str, options: dict):
+    # Quotas are enforced per consumer project, so all collects of that project share it
+    requests_per_minute = {
+        **API_RATE_LIMITS,
+        **(options.get("api_rate_limits") or {}),
+    }.get(api)
+    if not requests_per_minute:
+        return None
+
+    with _TOKEN_BUCKETS_LOCK:
+        token_bucket = _TOKEN_BUCKETS.get((api, quota_scope))
+        if token_bucket is None:
+            token_bucket = _TOKEN_BUCKETS[(api, quota_scope)] = TokenBucket(
+                requests_per_minute
+            )
+        elif token_bucket.rate != requests_per_minute / 60:
+            token_bucket.set_rate(requests_per_minute)
+        return token_bucket
@@ -0,0 +1,97 @@
+import copy
+import functools
+import inspect
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+__all__ = ["RequestCache", "request_cache_scope", "collect_cache"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_REQUEST_CACHE = ContextVar("request_cache", default=None)
+
+
+class _CacheEntry:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class RequestCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_call(self, key: tuple, func):
+        with self._lock:
+            entry = self._entries.get(key)
+            is_leader = entry is None
+            if is_leader:
+                entry = self._entries[key] = _CacheEntry()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if is_leader:
+            try:
+                entry.value = func()
+            except Exception as e:
+                entry.error = e
+                with self._lock:
+                    self._entries.pop(key, None)
+                raise
+            finally:
+                entry.done.set()
+        else:
+            entry.done.wait()
+            if entry.error is not None:
+                raise entry.error
+
+        # Callers mutate responses in place, so every caller gets its own copy
+        return copy.deepcopy(entry.value)
+
+
+@contextmanager
+def request_cache_scope():
+    previous = _REQUEST_CACHE.get()
+    request_cache = RequestCache()
+    _REQUEST_CACHE.set(request_cache)
+    try:
+        yield request_cache
+    finally:
+        _REQUEST_CACHE.set(previous)
+
+
+def collect_cache(method):
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        request_cache = _REQUEST_CACHE.get()
+        if request_cache is None:
+            return method(self, *args, **kwargs)
+
+        bound_args = signature.bind(self, *args, **kwargs)
+        bound_args.apply_defaults()
+        arguments = [
+            (name, value)
+            for name, value in bound_args.arguments.items()
+            if name != "self"
+        ]
+        key = (
+            self.google_client_service,
+            self.version,
+            # The same email may come with different keys and access
+            self.secret_digest,
+            self.project_id,
+            method.__name__,
+            repr(arguments),
+        )
+        return request_cache.get_or_call(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Generator
+
+from spaceone.core.error import ERROR_BASE
+
+from plugin.conf.global_conf import (
+    BATCH_MAX_REQUESTS,
+    LOCAL_CACHE_DIR,
+    ROLE_CATALOG_MEMORY_SIZE,
+    ROLE_CATALOG_PAGE_SIZE,
+    ROLE_CATALOG_TTL,
+)
+
+__all__ = ["RoleCatalog"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+
+class RoleCatalog:
+    _catalog = None
+    _catalog_lock = threading.Lock()
+
+    def __init__(self, path: str, memory_size: int = ROLE_CATALOG_MEMORY_SIZE):
+        self.path = path
+        self.memory_size = memory_size
+        self._roles = OrderedDict()
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._connection = self._connect(path)
+
+    @classmethod
+    def get_catalog(cls) -> "RoleCatalog":
+        # Predefined roles are the same for every secret, so one catalog per worker
+        with cls._catalog_lock:
+            if cls._catalog is None:
+                cls._catalog = cls(os.path.join(LOCAL_CACHE_DIR, "role_catalog.db"))
+            return cls._catalog
+
+    @classmethod
+    def load(cls, iam_connector, options: dict):
+        ttl = options.get("role_catalog_ttl", ROLE_CATALOG_TTL)
+        try:
+            catalog = cls.get_catalog()
+            if catalog.sync(iam_connector, ttl):
+                return catalog
+        except sqlite3.Error as e:
+            _LOGGER.warning(f"[RoleCatalog] Role catalog is unavailable: {e}")
+        return None
+
+    def sync(self, iam_connector, ttl: int) -> bool:
+        # Concurrent collects wait for the one revalidating the catalog
+        with self._sync_lock:
+            synced_at = float(self._get_info("synced_at") or 0)
+            if ttl and time.time() - synced_at <= ttl and self.count():
+                return True
+
+            role_etags = iam_connector.list_role_etags()
+            if role_etags is None:
+                _LOGGER.warning(
+                    "[RoleCatalog] Failed to revalidate predefined roles, "
+                    "using the cached catalog"
+                )
+                return self.count() > 0
+
+            stored_etags = self._list_etags()
+            changed = {
+                name
+                for name, etag in role_etags.items()
+                if not etag or stored_etags.get(name) != etag
+            }
+            deleted = [name for name in stored_etags if name not in role_etags]
+
+            if len(changed) > BATCH_MAX_REQUESTS:
+                # e.g. the first load, where a few roles.list pages beat many batches
+                roles = []
+                try:
+                    for role in iam_connector.iter_roles():
+                        if role.get("name") in changed:
+                            roles.append(role)
+                        if len(roles) >= ROLE_CATALOG_PAGE_SIZE:
+                            changed -= self._put_roles(roles, role_etags)
+                            roles = []
+                except ERROR_BASE as e:
+                    # Roles stored so far are kept, the rest waits for the next sync
+                    _LOGGER.warning(
+                        f"[RoleCatalog] Failed to list predefined roles: {e}"
+                    )
+                    self._put_roles(roles, role_etags)
+                    return self.count() > 0
+                changed -= self._put_roles(roles, role_etags)
+
+            if changed:
+                roles = iam_connector.get_roles_batch(sorted(changed))
+                changed -= self._put_roles(
+                    [role for role in roles.values() if role], role_etags
+                )
+
+            self._delete_roles(deleted)
+            if changed:
+                # Left stale so the next collect retries the missing roles
+                _LOGGER.debug(f"[RoleCatalog] Failed to fetch {len(changed)} roles")
+            else:
+                self._set_info("synced_at", str(time.time()))
+
+            return self.count() > 0
+
+    def get_role(self, name: str):
+        with self._lock:
+            role = self._roles.get(name)
+            if role is not None:
+                self._roles.move_to_end(name)
+                return role
+
+            row = self._connection.execute(
+                "SELECT role FROM roles WHERE name = ?", (name,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            role = self._roles[name] = json.loads(row[0])
+            while len(self._roles) > self.memory_size:
+                self._roles.popitem(last=False)
+            return role
+
+    def iter_roles(self) -> Generator[dict, None, None]:
+        # Rows are read page by page so the catalog is never decoded as a whole
+        last_name = ""
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT name, role FROM roles WHERE name > ? ORDER BY name LIMIT ?",
+                    (last_name, ROLE_CATALOG_PAGE_SIZE),
+                ).fetchall()
+            if not rows:
+                return
+
+            for name, role in rows:
+                yield json.loads(role)
+            last_name = rows[-1][0]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM roles").fetchone()[0]
+
+    def _list_etags(self) -> dict:
+        with self._lock:
+            return dict(self._connection.execute("SELECT name, etag FROM roles"))
+
+    def _put_roles(self, roles: list, role_etags: dict) -> set:
+        # The etag of roles.list is stored so later listings compare like with like
+        rows = [
+            (role["name"], role_etags.get(role["name"]), json.dumps(role))
+            for role in roles
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO roles (name, etag, role) VALUES (?, ?, ?)",
+                rows,
+            )
+            for role in roles:
+                self._roles.pop(role["name"], None)
+        return {role["name"] for role in roles}
+
+    def _delete_roles(self, names: list) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM roles WHERE name = ?", [(name,) for name in names]
+            )
+            for name in names:
+                self._roles.pop(name, None)
+
+    def _get_info(self, key: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM catalog_info WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_info(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO catalog_info (key, value) VALUES (?, ?)",
+                (key, value),
+            )
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+        except (OSError, sqlite3.Error) as e:
+            _LOGGER.debug(f"[RoleCatalog] Failed to open {path}, kept in memory: {e}")
+            connection = sqlite3.connect(":memory:", check_same_thread=False)
+
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS roles "
+                "(name TEXT PRIMARY KEY, etag TEXT, role TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS catalog_info "
+                "(key TEXT PRIMARY KEY, value TEXT)"
+            )
+        return connection
@@ -0,0 +1,11 @@
+import hashlib
+import json
+
+__all__ = ["get_secret_digest"]
+
+
+def get_secret_digest(secret_data: dict) -> str:
+    # Anything cached or shared across collects is keyed by the whole secret, key
+    # material included, so a secret that only reuses an email or key id never hits it
+    content = json.dumps(secret_data, sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,128 @@
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import google.auth.credentials
+import google.oauth2.service_account
+
+from plugin.conf.global_conf import (
+    GOOGLE_CLOUD_SCOPES,
+    SECRET_CACHE_IDLE_TTL,
+    TOKEN_CACHE_MAX_CREDENTIALS,
+    TOKEN_MIN_REFRESH_INTERVAL,
+    TOKEN_REFRESH_MARGIN,
+)
+from plugin.utils.secret import get_secret_digest
+
+__all__ = ["SharedTokenCredentials", "get_shared_credentials"]
+
+_LOGGER = logging.getLogger("spaceone")
+
+_CREDENTIALS = OrderedDict()
+_CREDENTIALS_LOCK = threading.Lock()
+
+
+class SharedTokenCredentials(google.auth.credentials.Credentials):
+    def __init__(self, credentials: google.oauth2.service_account.Credentials):
+        super().__init__()
+        self._credentials = credentials
+        self._refresh_lock = threading.Lock()
+        self.refreshed_at = None
+        self.refresh_count = 0
+        self.used_at = time.monotonic()
+
+    @property
+    def service_account_email(self) -> str:
+        return self._credentials.service_account_email
+
+    @property
+    def expired(self) -> bool:
+        return self._needs_refresh()
+
+    @property
+    def valid(self) -> bool:
+        return not self._needs_refresh()
+
+    def refresh(self, request) -> None:
+        # Also called by AuthorizedHttp on a 401, so the token is renewed even while it
+        # looks valid, unless another thread renewed it a moment ago
+        with self._refresh_lock:
+            if (
+                self.refreshed_at is not None
+                and time.monotonic() - self.refreshed_at < TOKEN_MIN_REFRESH_INTERVAL
+                and not self._needs_refresh()
+            ):
+                return
+            self._refresh(request)
+
+    def before_request(self, request, method, url, headers) -> None:
+        self.apply(headers, token=self.get_token(request))
+
+    def get_token(self, request) -> str:
+        if self._needs_refresh():
+            with self._refresh_lock:
+                # Concurrent callers wait for the first one instead of refreshing too
+                if self._needs_refresh():
+                    self._refresh(request)
+        return self.token
+
+    def invalidate(self) -> None:
+        with self._refresh_lock:
+            self.token = None
+            self.refreshed_at = None
+
+    def _refresh(self, request) -> None:
+        self._credentials.refresh(request)
+        self.token = self._credentials.token
+        self.expiry = self._credentials.expiry
+        self.refreshed_at = time.monotonic()
+        self.refresh_count += 1
+        _LOGGER.debug(
+            f"[SharedTokenCredentials] Refreshed the access token of "
+            f"{self.service_account_email} (expires at {self.expiry})"
+        )
+
+    def _needs_refresh(self) -> bool:
+        # Renewed ahead of expiry so requests in flight never carry an expiring token
+        if self.token is None:
+            return True
+        if self.expiry is None:
+            return False
+        refresh_at = self.expiry - datetime.timedelta(seconds=TOKEN_REFRESH_MARGIN)
+        return datetime.datetime.utcnow() >= refresh_at
+
+
+def get_shared_credentials(
+    secret_data: dict, scopes: tuple = GOOGLE_CLOUD_SCOPES
+) -> SharedTokenCredentials:
+    # One token per secret and scopes for all connectors of this worker. The whole
+    # secret is keyed, a rotated key may keep its email and key id
+    key = (get_secret_digest(secret_data), scopes)
+    now = time.monotonic()
+    with _CREDENTIALS_LOCK:
+        credentials = _CREDENTIALS.get(key)
+        if credentials is None:
+            credentials = _CREDENTIALS[key] = SharedTokenCredentials(
+                google.oauth2.service_account.Credentials.from_service_account_info(
+                    secret_data, scopes=list(scopes)
+                )
+            )
+        else:
+            _CREDENTIALS.move_to_end(key)
+        credentials.used_at = now
+        _evict_credentials(now)
+        return credentials
+
+
+def _evict_credentials(now: float) -> None:
+    # Connectors still holding evicted credentials keep using them until they are gone
+    while _CREDENTIALS:
+        key, credentials = next(iter(_CREDENTIALS.items()))
+        if (
+            len(_CREDENTIALS) <= TOKEN_CACHE_MAX_CREDENTIALS
+            and now - credentials.used_at < SECRET_CACHE_IDLE_TTL
+        ):
+            break
+        del _CREDENTIALS[key]
@@ -33,6 +33,7 @@ setup(
     install_requires=[
         "spaceone-api",
         "google-api-python-client",
+        "httpx[http2]",
     ],
     package_data={"plugin": ["metadata/*.yaml", "metrics/**/**/*.yaml"]},
     zip_safe=False,
@@ -0,0 +1,31 @@
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+def generate_private_key() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+
+@pytest.fixture(scope="session")
+def secret_data() -> dict:
+    return {
+        "type": "service_account",
+        "project_id": "my-project",
+        "private_key_id": "key-id",
+        "private_key": generate_private_key(),
+        "client_email": "collector@my-project.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
+@pytest.fixture
+def other_key_secret_data(secret_data) -> dict:
+    # Same email, key id and project, different key material
+    return {**secret_data, "private_key": generate_private_key()}
@@ -0,0 +1,42 @@
+from plugin.manager.asset_registry import AssetRegistry
+
+
+def test_namespace_is_loaded_before_the_metrics_of_a_type():
+    registry = AssetRegistry()
+
+    responses = registry.list_metrics("IAM", "ServiceAccount")
+
+    assert responses[0]["resource_type"] == "inventory.Namespace"
+    assert {response["resource_type"] for response in responses[1:]} == {
+        "inventory.Metric"
+    }
+
+
+def test_cloud_service_type_is_made_once():
+    registry = AssetRegistry()
+    calls = []
+
+    def make_cloud_service_type():
+        calls.append(1)
+        return {"name": "ServiceAccount"}
+
+    for _ in range(2):
+        registry.get_cloud_service_type(
+            ("IAM", "ServiceAccount"), make_cloud_service_type
+        )
+
+    assert calls == [1]
+
+
+def test_changes_of_one_caller_do_not_leak_into_the_registry():
+    registry = AssetRegistry()
+
+    registry.list_metrics("IAM", "ServiceAccount")[0]["changed"] = True
+    registry.get_region()["changed"] = True
+    registry.get_cloud_service_type(("IAM", "Role"), lambda: {"tags": {}})["tags"][
+        "changed"
+    ] = True
+
+    assert "changed" not in registry.list_metrics("IAM", "ServiceAccount")[0]
+    assert "changed" not in registry.get_region()
+    assert registry.get_cloud_service_type(("IAM", "Role"), dict) == {"tags": {}}
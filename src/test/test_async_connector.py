@@ -0,0 +1,52 @@
+import threading
+import time
+
+from plugin.connector.async_connector import AsyncGoogleCloudConnector
+from plugin.connector.async_iam_connector import AsyncIAMConnector
+
+
+def test_http_client_is_created_once_by_concurrent_callers(monkeypatch):
+    monkeypatch.setattr(AsyncGoogleCloudConnector, "_http_client", None)
+    created = []
+
+    def create_http_client():
+        time.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(
+        AsyncGoogleCloudConnector,
+        "_create_http_client",
+        staticmethod(create_http_client),
+    )
+    clients = []
+    threads = [
+        threading.Thread(
+            target=lambda: clients.append(AsyncGoogleCloudConnector._get_http_client())
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+
+
+def test_token_refresh_transport_is_reused(secret_data):
+    connector = AsyncIAMConnector({}, secret_data, None)
+    requests = []
+
+    class StubCredentials:
+        def get_token(self, request):
+            requests.append(request)
+            return "token"
+
+    connector.credentials = StubCredentials()
+
+    connector._get_auth_headers()
+    connector._get_auth_headers()
+
+    assert requests[0] is requests[1]
@@ -0,0 +1,52 @@
+from plugin.connector.iam_connector import IAMConnector
+from plugin.utils.circuit_breaker import (
+    circuit_breaker_scope,
+    iter_in_cloud_service_type_scope,
+)
+
+
+def test_breaker_is_reported_for_the_cloud_service_types_it_cut():
+    def collect_service_accounts(registry):
+        registry.open("iam", "my-project", "SERVICE_DISABLED", "disabled")
+        yield "service account"
+
+    def collect_roles(registry):
+        registry.is_open("iam", "my-project")
+        yield "role"
+
+    with circuit_breaker_scope() as registry:
+        list(
+            iter_in_cloud_service_type_scope(
+                collect_service_accounts(registry), "IAM", "ServiceAccount"
+            )
+        )
+        list(iter_in_cloud_service_type_scope(collect_roles(registry), "IAM", "Role"))
+
+    (breaker,) = registry.list_open_breakers()
+    assert breaker.cloud_service_types == {("IAM", "ServiceAccount"), ("IAM", "Role")}
+    assert breaker.skipped == 1
+
+
+def test_batch_is_skipped_while_the_breaker_is_open(secret_data, monkeypatch):
+    connector = IAMConnector({}, secret_data, None)
+    monkeypatch.setattr(
+        connector,
+        "_new_batch_http_request",
+        lambda: (_ for _ in ()).throw(AssertionError("batch was sent")),
+    )
+
+    with circuit_breaker_scope() as registry:
+        registry.open("iam", "other-project", "SERVICE_DISABLED", "disabled")
+        responses = connector.execute_batch({"a": None, "b": None}, "other-project")
+
+    assert responses == {"a": None, "b": None}
+    assert registry.list_open_breakers()[0].skipped == 1
+
+
+def test_dismissed_breaker_keeps_skipping_but_is_not_reported():
+    with circuit_breaker_scope() as registry:
+        registry.open("policyanalyzer", "my-project", "SERVICE_DISABLED", "disabled")
+        registry.dismiss("policyanalyzer", "my-project")
+
+        assert registry.is_open("policyanalyzer", "my-project")
+        assert registry.list_open_breakers() == []
@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+from plugin.connector import client_pool
+from plugin.connector.client_pool import ClientPool, client_lease_scope
+from plugin.connector.iam_connector import IAMConnector
+
+
+def test_secrets_with_different_keys_do_not_share_clients(
+    secret_data, other_key_secret_data
+):
+    connector = IAMConnector({}, secret_data, None)
+    other_connector = IAMConnector({}, other_key_secret_data, None)
+
+    assert connector._get_client_pool() is not other_connector._get_client_pool()
+
+
+def test_same_secret_shares_clients(secret_data):
+    connector = IAMConnector({}, secret_data, None)
+    other_connector = IAMConnector({}, dict(secret_data), None)
+
+    assert connector._get_client_pool() is other_connector._get_client_pool()
+
+
+class _Client:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_least_recently_used_pools_are_evicted(monkeypatch):
+    monkeypatch.setattr(ClientPool, "_pools", OrderedDict())
+    monkeypatch.setattr(client_pool, "CLIENT_POOL_MAX_POOLS", 2)
+
+    first = ClientPool.get_pool(("first",), _Client)
+    idle_client = first.acquire().client
+    first.release(idle_client)
+    ClientPool.get_pool(("second",), _Client)
+    ClientPool.get_pool(("first",), _Client)
+    ClientPool.get_pool(("third",), _Client)
+
+    assert list(ClientPool._pools) == [("first",), ("third",)]
+    assert not idle_client.closed
+
+    ClientPool.get_pool(("fourth",), _Client)
+
+    assert list(ClientPool._pools) == [("third",), ("fourth",)]
+    assert idle_client.closed
+
+
+def test_idle_pools_are_evicted(monkeypatch):
+    monkeypatch.setattr(ClientPool, "_pools", OrderedDict())
+    now = [1000.0]
+    monkeypatch.setattr(client_pool.time, "monotonic", lambda: now[0])
+
+    ClientPool.get_pool(("idle",), _Client)
+    now[0] += client_pool.SECRET_CACHE_IDLE_TTL
+    ClientPool.get_pool(("active",), _Client)
+
+    assert list(ClientPool._pools) == [("active",)]
+
+
+def test_leases_are_released_when_the_scope_exits(monkeypatch, secret_data):
+    monkeypatch.setattr(ClientPool, "_pools", OrderedDict())
+    connector = IAMConnector({}, secret_data, None)
+    pool = connector._get_client_pool()
+    monkeypatch.setattr(pool, "factory", _Client)
+
+    with client_lease_scope():
+        client = connector.client
+        assert connector.client is client
+        assert pool._idle == []
+
+    assert pool._idle == [client]
+
+    with client_lease_scope():
+        assert connector.client is client
+        assert pool._idle == []
+
+
+def test_lease_is_a_context_manager():
+    pool = ClientPool(("lease",), _Client, 1)
+
+    with pool.acquire() as lease:
+        assert pool._idle == []
+
+    assert lease.released
+    assert pool._idle == [lease.client]
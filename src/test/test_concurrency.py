@@ -0,0 +1,71 @@
+import threading
+
+import httplib2
+
+from plugin.connector.client_pool import ThrottledHttp
+from plugin.utils.concurrency import AdaptiveConcurrencyLimiter
+
+
+class StubCredentials:
+    def __init__(self):
+        self.refreshes = 0
+
+    def before_request(self, request, method, url, headers):
+        headers["authorization"] = f"Bearer {self.refreshes}"
+
+    def refresh(self, request):
+        self.refreshes += 1
+
+
+class StubHttp:
+    def __init__(self, statuses: list):
+        self.statuses = list(statuses)
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        return httplib2.Response({"status": self.statuses.pop(0)}), b"{}"
+
+
+def test_refresh_retry_does_not_deadlock_at_window_one():
+    limiter = AdaptiveConcurrencyLimiter("iam")
+    limiter.window = 1
+    credentials = StubCredentials()
+    http = ThrottledHttp(
+        credentials, http=StubHttp([401, 200]), concurrency_limiter=limiter
+    )
+    responses = []
+
+    thread = threading.Thread(
+        target=lambda: responses.append(http.request("https://iam.googleapis.com")),
+        daemon=True,
+    )
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert responses[0][0].status == 200
+    assert credentials.refreshes == 1
+    assert limiter.in_flight == 0
+
+
+def test_acquire_gives_up_after_timeout():
+    limiter = AdaptiveConcurrencyLimiter("iam")
+    limiter.window = 1
+    limiter.acquire()
+
+    assert limiter.acquire(timeout=0.01) is False
+    assert limiter.in_flight == 2
+
+
+def test_latency_baseline_relaxes_after_a_fast_period():
+    limiter = AdaptiveConcurrencyLimiter("iam")
+    for _ in range(limiter.latencies.maxlen):
+        limiter.acquire()
+        limiter.release(0.1, 200)
+    fast_baseline = limiter.baseline_p95
+
+    for _ in range(limiter.latencies.maxlen * 2):
+        limiter.acquire()
+        limiter.release(0.15, 200)
+
+    assert fast_baseline == 0.1
+    assert limiter.baseline_p95 > fast_baseline
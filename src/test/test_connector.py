@@ -0,0 +1,76 @@
+import pytest
+
+from plugin.connector import ERROR_GOOGLE_API_LISTING_INCOMPLETE
+from plugin.connector.iam_connector import IAMConnector
+from plugin.utils.circuit_breaker import circuit_breaker_scope
+from plugin.utils.request_cache import request_cache_scope
+
+
+@pytest.fixture
+def iam_connector(secret_data, monkeypatch):
+    connector = IAMConnector({}, secret_data, None)
+    connector.pages = []
+
+    def execute_page(request, project_id=None):
+        return connector.pages.pop(0)
+
+    monkeypatch.setattr(connector, "execute_page", execute_page)
+    return connector
+
+
+def list_next(previous_request, previous_response):
+    return "next" if previous_response.get("nextPageToken") else None
+
+
+def test_failed_page_raises_instead_of_ending_the_listing(iam_connector):
+    iam_connector.pages = [{"roles": [{"name": "a"}], "nextPageToken": "2"}, None]
+
+    with pytest.raises(ERROR_GOOGLE_API_LISTING_INCOMPLETE):
+        list(iam_connector.paginate("first", list_next, "roles"))
+
+
+def test_failed_page_behind_an_open_breaker_is_reported_by_the_breaker(iam_connector):
+    iam_connector.pages = [None]
+
+    with circuit_breaker_scope() as registry:
+        registry.open("iam", "other-project", "SERVICE_DISABLED", "disabled")
+        roles = list(
+            iam_connector.paginate("first", list_next, "roles", "other-project")
+        )
+
+    assert roles == []
+    assert registry.list_open_breakers()[0].skipped == 0
+
+
+def test_listing_is_fetched_once_per_collect(iam_connector, monkeypatch):
+    calls = []
+
+    def iter_project_roles(project_id=None):
+        calls.append(project_id)
+        return iter([{"name": "projects/my-project/roles/custom"}])
+
+    monkeypatch.setattr(iam_connector, "iter_project_roles", iter_project_roles)
+
+    with request_cache_scope():
+        iam_connector.list_project_roles("my-project")
+        iam_connector.list_project_roles("my-project")
+
+    assert calls == ["my-project"]
+
+
+def test_listing_is_not_shared_between_secrets(
+    secret_data, other_key_secret_data, monkeypatch
+):
+    calls = []
+
+    def iter_project_roles(self, project_id=None):
+        calls.append(project_id)
+        return iter([])
+
+    monkeypatch.setattr(IAMConnector, "iter_project_roles", iter_project_roles)
+
+    with request_cache_scope():
+        IAMConnector({}, secret_data, None).list_project_roles("my-project")
+        IAMConnector({}, other_key_secret_data, None).list_project_roles("my-project")
+
+    assert calls == ["my-project", "my-project"]
@@ -0,0 +1,65 @@
+import socket
+
+import googleapiclient.errors
+import httplib2
+import pytest
+
+from plugin.utils import error_handlers
+from plugin.utils.error_handlers import api_retry_handler, retry_budget_scope
+
+
+def http_error(status: int) -> googleapiclient.errors.HttpError:
+    return googleapiclient.errors.HttpError(httplib2.Response({"status": status}), b"")
+
+
+class StubConnector:
+    google_client_service = "iam"
+    project_id = "my-project"
+
+    def __init__(self, errors: list):
+        self.errors = list(errors)
+        self.calls = 0
+        self.resets = 0
+
+    def reset_client(self):
+        self.resets += 1
+
+    @api_retry_handler(default_response="default")
+    def call(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(error_handlers, "sleep", lambda seconds: None)
+
+
+def test_permanent_error_is_not_retried():
+    connector = StubConnector([http_error(404)])
+
+    assert connector.call() == "default"
+    assert connector.calls == 1
+
+
+def test_transient_error_is_retried_on_the_same_client():
+    connector = StubConnector([http_error(503)])
+
+    assert connector.call() == "ok"
+    assert connector.calls == 2
+    assert connector.resets == 0
+
+
+def test_transport_error_resets_the_client():
+    connector = StubConnector([socket.timeout()])
+
+    assert connector.call() == "ok"
+    assert connector.resets == 1
+
+
+def test_retry_budget_is_shared_by_a_collect():
+    with retry_budget_scope(1):
+        assert StubConnector([http_error(503)]).call() == "ok"
+        assert StubConnector([http_error(503)]).call() == "default"
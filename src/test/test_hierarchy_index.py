@@ -0,0 +1,95 @@
+import threading
+import time
+
+import pytest
+
+from plugin.utils.hierarchy_index import HierarchyIndex
+from plugin.utils.local_store import LocalStore
+
+
+class StubConnector:
+    project_id = "my-project"
+
+    def __init__(self, secret_digest: str):
+        self.secret_digest = secret_digest
+
+
+@pytest.fixture
+def builds(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        HierarchyIndex, "_store", LocalStore("hierarchy", str(tmp_path))
+    )
+    monkeypatch.setattr(HierarchyIndex, "_indexes", {})
+    builds = []
+
+    def build(cls, rm_v3_connector, options):
+        builds.append(rm_v3_connector.secret_digest)
+        return cls([], [], [{"projectId": "p1", "name": "projects/1"}])
+
+    monkeypatch.setattr(HierarchyIndex, "build", classmethod(build))
+    return builds
+
+
+def test_index_is_not_cached_by_default(builds):
+    HierarchyIndex.load_or_build(StubConnector("a"), {})
+    HierarchyIndex.load_or_build(StubConnector("a"), {})
+    assert builds == ["a", "a"]
+
+
+def test_index_is_not_shared_between_secrets(builds):
+    options = {"hierarchy_cache_ttl": 3600}
+    HierarchyIndex.load_or_build(StubConnector("a"), options)
+    HierarchyIndex.load_or_build(StubConnector("b"), options)
+    HierarchyIndex.load_or_build(StubConnector("a"), options)
+    assert builds == ["a", "b"]
+
+
+def test_index_loaded_from_disk_keeps_its_build_time(builds):
+    options = {"hierarchy_cache_ttl": 3600}
+    built = HierarchyIndex.load_or_build(StubConnector("a"), options)
+    HierarchyIndex._indexes.clear()
+
+    loaded = HierarchyIndex.load_or_build(StubConnector("a"), options)
+    assert loaded is not built
+    assert loaded.created_at == built.created_at
+    assert builds == ["a"]
+
+
+def test_index_loaded_from_disk_expires_with_its_build_time(builds, monkeypatch):
+    options = {"hierarchy_cache_ttl": 3600}
+    HierarchyIndex.load_or_build(StubConnector("a"), options)
+    HierarchyIndex._indexes.clear()
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 3000)
+    HierarchyIndex.load_or_build(StubConnector("a"), options)
+    HierarchyIndex._indexes.clear()
+    monkeypatch.setattr(time, "time", lambda: now + 3700)
+    HierarchyIndex.load_or_build(StubConnector("a"), options)
+    assert builds == ["a", "a"]
+
+
+def test_crawl_of_one_secret_does_not_block_another(monkeypatch, tmp_path):
+    monkeypatch.setattr(HierarchyIndex, "_indexes", {})
+    crawl_started = threading.Event()
+    release_crawl = threading.Event()
+
+    def build(cls, rm_v3_connector, options):
+        if rm_v3_connector.secret_digest == "slow":
+            crawl_started.set()
+            release_crawl.wait(5)
+        return cls([], [], [])
+
+    monkeypatch.setattr(HierarchyIndex, "build", classmethod(build))
+    slow = threading.Thread(
+        target=HierarchyIndex.load_or_build, args=(StubConnector("slow"), {})
+    )
+    slow.start()
+    crawl_started.wait(5)
+
+    started_at = time.monotonic()
+    HierarchyIndex.load_or_build(StubConnector("fast"), {})
+    assert time.monotonic() - started_at < 1
+
+    release_crawl.set()
+    slow.join()
@@ -0,0 +1,43 @@
+import pytest
+
+from plugin.connector.iam_connector import IAMConnector
+
+
+@pytest.fixture
+def iam_connector(secret_data, monkeypatch):
+    connector = IAMConnector({}, secret_data, None)
+    single_calls = []
+
+    def get_role(name):
+        single_calls.append(name)
+        return {"name": name}
+
+    monkeypatch.setattr(connector, "get_role", get_role)
+    connector.single_calls = single_calls
+    return connector
+
+
+def test_failed_role_lookup_is_not_repeated(iam_connector, monkeypatch):
+    monkeypatch.setattr(
+        iam_connector,
+        "execute_batch",
+        lambda requests: {"roles/viewer": {"name": "roles/viewer"}, "roles/gone": None},
+    )
+
+    roles = iam_connector.get_roles_batch(["roles/viewer", "roles/gone"])
+
+    assert roles == {"roles/viewer": {"name": "roles/viewer"}, "roles/gone": None}
+    assert iam_connector.single_calls == []
+
+
+def test_transient_role_lookup_failure_is_retried_alone(iam_connector, monkeypatch):
+    monkeypatch.setattr(
+        iam_connector,
+        "execute_batch",
+        lambda requests: {"roles/viewer": {"name": "roles/viewer"}},
+    )
+
+    roles = iam_connector.get_roles_batch(["roles/viewer", "roles/editor"])
+
+    assert roles["roles/editor"] == {"name": "roles/editor"}
+    assert iam_connector.single_calls == ["roles/editor"]
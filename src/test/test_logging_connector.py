@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from plugin.connector.logging_connector import LoggingConnector, format_timestamp
+from plugin.utils.local_store import LocalStore
+
+
+def entry(email: str, timestamp: str) -> dict:
+    return {
+        "timestamp": timestamp,
+        "protoPayload": {"authenticationInfo": {"principalEmail": email}},
+    }
+
+
+@pytest.fixture
+def logging_connector(secret_data, monkeypatch):
+    connector = LoggingConnector({"activity_cache_ttl": 0}, secret_data, None)
+    connector.pages = []
+    connector.page_tokens = []
+
+    def list_entries_principals(project_id, emails, start, end, page_token=None):
+        connector.page_tokens.append(page_token)
+        return connector.pages.pop(0)
+
+    monkeypatch.setattr(connector, "_list_entries_principals", list_entries_principals)
+    return connector
+
+
+def scan(connector, emails: list) -> dict:
+    time_now = datetime.utcnow()
+    return connector._scan_last_log_entry_timestamps(
+        "my-project", emails, time_now - timedelta(days=30), time_now
+    )
+
+
+def test_empty_page_with_token_is_followed(logging_connector):
+    logging_connector.pages = [
+        {"entries": [], "nextPageToken": "page-2"},
+        {"entries": [entry("a@x.com", "2026-10-01T00:00:00Z")]},
+    ]
+
+    result = scan(logging_connector, ["a@x.com", "b@x.com"])
+
+    assert result == {"a@x.com": "2026-10-01T00:00:00Z", "b@x.com": None}
+    assert logging_connector.page_tokens == [None, "page-2"]
+
+
+def test_failed_page_leaves_accounts_unresolved(logging_connector):
+    logging_connector.pages = [
+        {"entries": [entry("a@x.com", "2026-10-01T00:00:00Z")], "nextPageToken": "2"},
+        None,
+    ]
+
+    result = scan(logging_connector, ["a@x.com", "b@x.com"])
+
+    assert result == {"a@x.com": "2026-10-01T00:00:00Z"}
+
+
+@pytest.fixture
+def activity_store(tmp_path, monkeypatch):
+    store = LocalStore("last_activity", str(tmp_path))
+    monkeypatch.setattr(LoggingConnector, "_activity_store", store)
+    return store
+
+
+def bulk_connector(secret_data: dict, monkeypatch, found: dict) -> LoggingConnector:
+    connector = LoggingConnector({}, secret_data, None)
+    monkeypatch.setattr(
+        connector,
+        "_scan_last_log_entry_timestamps",
+        lambda project_id, emails, start, end: {
+            email: found.get(email) for email in emails
+        },
+    )
+    return connector
+
+
+def test_completed_scans_are_cached_and_failed_ones_are_not(
+    secret_data, activity_store, monkeypatch
+):
+    timestamp = (datetime.utcnow() - timedelta(days=1)).isoformat() + "Z"
+    connector = LoggingConnector({}, secret_data, None)
+    monkeypatch.setattr(
+        connector,
+        "_scan_last_log_entry_timestamps",
+        # c@x.com is missing from the result, its scan failed
+        lambda project_id, emails, start, end: {"a@x.com": timestamp, "b@x.com": None},
+    )
+
+    connector.get_last_log_entry_timestamps(
+        "my-project", ["a@x.com", "b@x.com", "c@x.com"]
+    )
+
+    stored = activity_store.get(
+        f"{connector.secret_digest}:my-project:{connector.log_search_period}"
+    )
+    assert sorted(stored) == ["a@x.com", "b@x.com"]
+    assert stored["b@x.com"]["lastActivityTime"] is None
+
+
+def test_dormant_account_is_only_searched_since_the_last_check(
+    secret_data, activity_store, monkeypatch
+):
+    connector = bulk_connector(secret_data, monkeypatch, {})
+    connector.get_last_log_entry_timestamps("my-project", ["idle@x.com"])
+    start_times = []
+    monkeypatch.setattr(
+        connector,
+        "_scan_last_log_entry_timestamps",
+        lambda project_id, emails, start, end: start_times.append(start)
+        or {email: None for email in emails},
+    )
+
+    connector.get_last_log_entry_timestamps("my-project", ["idle@x.com"])
+
+    assert datetime.utcnow() - start_times[0] < timedelta(days=1)
+
+
+def test_activity_cache_is_not_shared_between_secrets(
+    secret_data, other_key_secret_data, activity_store, monkeypatch
+):
+    timestamp = (datetime.utcnow() - timedelta(days=1)).isoformat() + "Z"
+    connector = bulk_connector(secret_data, monkeypatch, {"a@x.com": timestamp})
+    connector.get_last_log_entry_timestamps("my-project", ["a@x.com"])
+
+    other_connector = bulk_connector(other_key_secret_data, monkeypatch, {})
+
+    result = other_connector.get_last_log_entry_timestamps("my-project", ["a@x.com"])
+
+    assert result == {"a@x.com": None}
+
+
+def test_busy_account_is_not_paged_through_while_an_idle_one_is_missing(
+    secret_data, monkeypatch
+):
+    connector = LoggingConnector({"activity_cache_ttl": 0}, secret_data, None)
+    time_now = datetime(2026, 10, 18)
+    # 1000 entries of the busy account, newest first, 10 per page
+    busy_entries = [
+        entry("busy@x.com", format_timestamp(time_now - timedelta(minutes=index + 1)))
+        for index in range(1000)
+    ]
+    requests = []
+
+    def list_entries_principals(project_id, emails, start, end, page_token=None):
+        requests.append((emails, end, page_token))
+        entries = [
+            e for e in busy_entries if "busy@x.com" in emails and e["timestamp"] <= end
+        ]
+        offset = int(page_token or 0)
+        response = {"entries": entries[offset : offset + 10]}
+        if offset + 10 < len(entries):
+            response["nextPageToken"] = str(offset + 10)
+        return response
+
+    monkeypatch.setattr(connector, "_list_entries_principals", list_entries_principals)
+
+    result = connector._scan_last_log_entry_timestamps(
+        "my-project",
+        ["busy@x.com", "idle@x.com"],
+        time_now - timedelta(days=30),
+        time_now,
+    )
+
+    assert result == {"busy@x.com": busy_entries[0]["timestamp"], "idle@x.com": None}
+    assert len(requests) == 2
+    assert requests[1][0] == ("idle@x.com",)
+    assert requests[1][1] == busy_entries[9]["timestamp"]
@@ -0,0 +1,24 @@
+import threading
+
+from spaceone.core import config
+
+config.init_conf(package="plugin")
+
+from plugin import main  # noqa: E402
+
+
+def test_import_does_not_start_prewarm():
+    assert main._prewarm_thread is None
+    assert "prewarm" not in [thread.name for thread in threading.enumerate()]
+
+
+def test_prewarm_starts_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "_prewarm", lambda: calls.append(1))
+    monkeypatch.setattr(main, "_prewarm_thread", None)
+
+    main._start_prewarm()
+    main._start_prewarm()
+    main._prewarm_thread.join(5)
+
+    assert calls == [1]
@@ -0,0 +1,20 @@
+from plugin.utils.hierarchy_crawler import ProjectFilter
+
+
+def test_user_exclude_list_keeps_default_exclusion():
+    project_filter = ProjectFilter(
+        {"project_filter": {"exclude_project_ids": ["^dev-"]}}
+    )
+
+    assert not project_filter.match({"projectId": "dev-app"})
+    assert not project_filter.match({"projectId": "sys-12345"})
+    assert project_filter.match({"projectId": "prod-app"})
+
+
+def test_user_lifecycle_states_are_added_to_defaults():
+    project_filter = ProjectFilter(
+        {"project_filter": {"lifecycle_states": ["DELETE_REQUESTED"]}}
+    )
+
+    assert project_filter.show_deleted
+    assert project_filter.match({"projectId": "prod-app", "state": "ACTIVE"})
@@ -0,0 +1,57 @@
+import googleapiclient.errors
+import httplib2
+import pytest
+
+from plugin.connector.resource_manager_v3_connector import ResourceManagerV3Connector
+from plugin.utils import error_handlers
+
+
+class FlakyRequest:
+    def __init__(self, errors: list, response: dict):
+        self.errors = list(errors)
+        self.response = response
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.response
+
+
+class StubFolders:
+    def __init__(self, request: FlakyRequest):
+        self.request = request
+
+    def list(self, parent):
+        return self.request
+
+    def list_next(self, previous_request, previous_response):
+        return None
+
+
+class StubClient:
+    def __init__(self, request: FlakyRequest):
+        self.request = request
+
+    def folders(self):
+        return StubFolders(self.request)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(error_handlers, "sleep", lambda seconds: None)
+
+
+def test_transient_error_on_a_hierarchy_page_is_retried(secret_data, monkeypatch):
+    request = FlakyRequest(
+        [googleapiclient.errors.HttpError(httplib2.Response({"status": 429}), b"")],
+        {"folders": [{"name": "folders/1"}]},
+    )
+    monkeypatch.setattr(
+        ResourceManagerV3Connector, "client", property(lambda self: StubClient(request))
+    )
+    connector = ResourceManagerV3Connector({}, secret_data, None)
+
+    assert connector.list_folders("organizations/1") == [{"name": "folders/1"}]
+    assert request.calls == 2
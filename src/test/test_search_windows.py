@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+
+from plugin.connector.logging_connector import format_timestamp, get_search_windows
+
+TIME_NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def test_single_strategy_searches_the_whole_period_at_once():
+    start_time = TIME_NOW - timedelta(days=92)
+
+    assert get_search_windows("single", start_time, TIME_NOW) == [
+        (format_timestamp(start_time), format_timestamp(TIME_NOW))
+    ]
+
+
+def test_probing_windows_cover_the_period_newest_first_without_gaps():
+    start_time = TIME_NOW - timedelta(days=92)
+
+    windows = get_search_windows("probing", start_time, TIME_NOW)
+
+    assert windows[0] == (
+        format_timestamp(TIME_NOW - timedelta(days=1)),
+        format_timestamp(TIME_NOW),
+    )
+    assert windows[-1][0] == format_timestamp(start_time)
+    for (_, older_end), (newer_start, _) in zip(windows[1:], windows):
+        assert older_end == newer_start
@@ -0,0 +1,55 @@
+import threading
+
+from plugin.connector.iam_connector import IAMConnector
+from plugin.connector.logging_connector import LoggingConnector
+from plugin.manager.iam import service_account_manager
+from plugin.manager.iam.service_account_manager import ServiceAccountManager
+
+
+class StubHierarchyIndex:
+    def list_projects(self) -> list:
+        return [{"projectId": "project-a"}, {"projectId": "project-b"}]
+
+    def list_organizations(self) -> list:
+        return []
+
+
+def test_projects_are_enriched_concurrently(secret_data, monkeypatch):
+    both_scanning = threading.Barrier(2, timeout=5)
+
+    def get_last_log_entry_timestamps(self, project_id, emails):
+        # Only returns once the other project's scan is in flight too
+        both_scanning.wait()
+        return {email: None for email in emails}
+
+    monkeypatch.setattr(
+        service_account_manager.HierarchyIndex,
+        "load_or_build",
+        classmethod(lambda cls, connector, options: StubHierarchyIndex()),
+    )
+    monkeypatch.setattr(
+        IAMConnector,
+        "list_service_accounts",
+        lambda self, project_id: [
+            {"email": f"sa@{project_id}.iam.gserviceaccount.com", "name": "sa"}
+        ],
+    )
+    monkeypatch.setattr(
+        IAMConnector,
+        "list_service_account_keys_batch",
+        lambda self, emails, project_id: {email: [] for email in emails},
+    )
+    monkeypatch.setattr(
+        LoggingConnector, "get_last_log_entry_timestamps", get_last_log_entry_timestamps
+    )
+
+    responses = list(
+        ServiceAccountManager().collect_cloud_services(
+            {"max_concurrency": 2}, secret_data, None
+        )
+    )
+
+    assert [response["account"] for response in responses] == [
+        "project-a",
+        "project-b",
+    ]
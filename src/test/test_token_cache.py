@@ -0,0 +1,51 @@
+from collections import OrderedDict
+
+from plugin.utils import token_cache
+from plugin.utils.token_cache import get_shared_credentials
+
+
+def test_credentials_are_shared_by_the_same_secret(secret_data):
+    assert get_shared_credentials(secret_data) is get_shared_credentials(
+        dict(secret_data)
+    )
+
+
+def test_token_is_not_shared_between_different_private_keys(
+    secret_data, other_key_secret_data
+):
+    credentials = get_shared_credentials(secret_data)
+    other_credentials = get_shared_credentials(other_key_secret_data)
+
+    credentials.token = "token-of-the-first-key"
+
+    assert other_credentials is not credentials
+    assert other_credentials.token is None
+
+
+def test_least_recently_used_credentials_are_evicted(
+    monkeypatch, secret_data, other_key_secret_data
+):
+    monkeypatch.setattr(token_cache, "_CREDENTIALS", OrderedDict())
+    monkeypatch.setattr(token_cache, "TOKEN_CACHE_MAX_CREDENTIALS", 1)
+
+    credentials = get_shared_credentials(secret_data)
+    get_shared_credentials(other_key_secret_data)
+
+    assert get_shared_credentials(secret_data) is not credentials
+    assert len(token_cache._CREDENTIALS) == 1
+
+
+def test_idle_credentials_are_evicted(monkeypatch, secret_data, other_key_secret_data):
+    monkeypatch.setattr(token_cache, "_CREDENTIALS", OrderedDict())
+    now = [1000.0]
+    monkeypatch.setattr(token_cache.time, "monotonic", lambda: now[0])
+
+    credentials = get_shared_credentials(secret_data)
+    now[0] += token_cache.SECRET_CACHE_IDLE_TTL - 1
+
+    assert get_shared_credentials(secret_data) is credentials
+
+    now[0] += token_cache.SECRET_CACHE_IDLE_TTL
+    other_credentials = get_shared_credentials(other_key_secret_data)
+
+    assert list(token_cache._CREDENTIALS.values()) == [other_credentials]